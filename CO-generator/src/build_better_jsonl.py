@@ -260,10 +260,10 @@ def build_jsonl():
     
     for file in files:
         print(f"  Processing: {file.name}")
-        raw = file.read_text(encoding="utf-8")
-        
-        # Use more content for better context (5000 chars)
-        content = raw[:5000] if len(raw) > 5000 else raw
+        # Use more content for better context (5000 chars); stop reading
+        # there instead of loading the whole file and slicing
+        with open(file, encoding="utf-8") as f:
+            content = f.read(5000)
         
         # Generate variations with different Apply/Analyze mixes
         variations = [
@@ -2,10 +2,16 @@
 Build ChromaDB from all PDFs in data/raw directory
 This creates a vector database for semantic search of syllabus content
 """
+import io
 import os
-import chromadb
+import sys
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
+from chromadb_utils import (
+    add_many_to_db, delete_source_from_db, get_client, mark_collection_updated,
+    COLLECTION_METADATA, EMBEDDING_FUNCTION
+)
 from PyPDF2 import PdfReader
 import re
 
@@ -13,84 +19,146 @@ import re
 RAW_DATA_DIR = "data/raw"
 CHROMA_DB_PATH = "data/chroma_db"
 COLLECTION_NAME = "dbms_syllabus"
+INGEST_BATCH = 1024  # Chunks embedded + stored at a time while extraction continues
+
+_CONTROL_RE = re.compile(r'[\x00-\x08\x0e-\x1b]')  # \s already covers \x0b-\x0c, \x1c-\x1f
+_WS_RE = re.compile(r'\s+')
+
+def _iter_pdf_pages(pdf_path):
+    """Yield (page_idx, text) one page at a time"""
+    reader = PdfReader(pdf_path)
+    for page_idx, page in enumerate(reader.pages):
+        yield page_idx, page.extract_text() or ""
 
 def extract_text_from_pdf(pdf_path):
     """Extract text from a PDF file"""
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        # Write pages straight into one buffer instead of re-copying a
+        # growing string on every page
+        buffer = io.StringIO()
+        for _, page_text in _iter_pdf_pages(pdf_path):
+            buffer.write(page_text)
+            buffer.write("\n")
+        return buffer.getvalue().strip()
     except Exception as e:
         print(f"❌ Error extracting {pdf_path}: {e}")
         return None
 
+def iter_extract(pdf_paths, max_workers=None):
+    """
+    Extract text from many PDFs, parsing them on a process pool (PDF parsing
+    is CPU-bound). A single file is parsed inline to skip pool start-up.
+    Yields texts in the same order as pdf_paths, each as soon as it's ready,
+    while the pool keeps parsing the rest.
+    """
+    if len(pdf_paths) < 2:
+        yield from (extract_text_from_pdf(pdf_path) for pdf_path in pdf_paths)
+        return
+    max_workers = max_workers or min(len(pdf_paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(extract_text_from_pdf, pdf_paths)
+
 def clean_text(text):
     """Clean extracted text"""
     if not text:
         return ""
+    # Remove special characters that might cause issues (first, so the
+    # whitespace pass below is the only one and leaves no doubled spaces)
+    text = _CONTROL_RE.sub('', text)
     # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
-    # Remove special characters that might cause issues
-    text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f]', '', text)
+    text = _WS_RE.sub(' ', text)
     return text.strip()
 
 def chunk_text(text, chunk_size=1000, overlap=200):
     """Split text into overlapping chunks for better context"""
-    if len(text) <= chunk_size:
+    text_len = len(text)
+    if text_len <= chunk_size:
         return [text]
     
     chunks = []
     start = 0
+    min_break = chunk_size * 0.7
     
-    while start < len(text):
+    while start < text_len:
         end = start + chunk_size
-        chunk = text[start:end]
         
         # Try to break at sentence boundary
-        if end < len(text):
-            # Look for sentence endings near the end
-            last_period = chunk.rfind('.')
-            last_newline = chunk.rfind('\n')
-            break_point = max(last_period, last_newline)
+        if end < text_len:
+            # Look for sentence endings near the end, searching the text in
+            # place rather than a sliced copy of the window
+            break_point = max(text.rfind('.', start, end), text.rfind('\n', start, end)) - start
             
-            if break_point > chunk_size * 0.7:  # If we found a good break point
-                chunk = chunk[:break_point + 1]
+            if break_point > min_break:  # If we found a good break point
                 end = start + break_point + 1
         
-        chunks.append(chunk.strip())
+        chunks.append(text[start:end].strip())
+        if end >= text_len:
+            break  # Last window reached the end; the overlap tail is already covered
         start = end - overlap  # Overlap for context
     
     return chunks
 
-def build_chromadb():
-    """Build ChromaDB from all PDFs in data/raw"""
+def mismatched_index_settings(metadata):
+    """
+    HNSW settings (distance space, M, ef) in COLLECTION_METADATA that an
+    existing collection was not built with. Chroma only applies them at
+    creation, so a mismatch needs a rebuild.
+    """
+    metadata = metadata or {}
+    return [
+        key for key, value in COLLECTION_METADATA.items()
+        if key.startswith("hnsw:") and metadata.get(key) != value
+    ]
+
+def build_chromadb(rebuild=False):
+    """
+    Build ChromaDB from all PDFs in data/raw
+    
+    Each chunk stores the SHA-1 of its file's cleaned text, so files whose
+    content hasn't changed since the last build are skipped without
+    re-embedding. Pass rebuild=True to clear the collection first; it is
+    also cleared when its HNSW settings differ from COLLECTION_METADATA
+    (e.g. collections created with L2 distance before the cosine switch).
+    """
     print("🔨 Building ChromaDB from data/raw...")
     
     # Initialize ChromaDB client
-    client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+    client = get_client(CHROMA_DB_PATH)
     
-    # Get or create collection
-    try:
-        collection = client.get_collection(COLLECTION_NAME)
-        print(f"📦 Found existing collection: {COLLECTION_NAME}")
-        # Clear existing collection to rebuild
-        client.delete_collection(COLLECTION_NAME)
-        print("🗑️  Cleared existing collection")
-    except:
-        pass
-    
-    collection = client.create_collection(
+    if not rebuild:
+        try:
+            existing = client.get_collection(COLLECTION_NAME, embedding_function=EMBEDDING_FUNCTION)
+        except Exception:
+            existing = None
+        mismatched = mismatched_index_settings(existing.metadata) if existing is not None else []
+        if mismatched:
+            print(f"⚠️  Existing collection differs in {', '.join(mismatched)}; rebuilding")
+            rebuild = True
+    
+    if rebuild:
+        try:
+            client.delete_collection(COLLECTION_NAME)
+            mark_collection_updated(CHROMA_DB_PATH)
+            print("🗑️  Cleared existing collection")
+        except:
+            pass
+    
+    collection = client.get_or_create_collection(
         name=COLLECTION_NAME,
-        metadata={"description": "DBMS Syllabus and Course Materials"}
+        metadata=COLLECTION_METADATA,
+        embedding_function=EMBEDDING_FUNCTION
     )
-    print(f"✅ Created collection: {COLLECTION_NAME}")
+    print(f"✅ Using collection: {COLLECTION_NAME}")
     
-    # Load embedding model
-    print("🔄 Loading embedding model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    print("✅ Embedding model loaded")
+    # Content fingerprints and chunk ids already stored, per source file.
+    # One unfiltered get() of this collection; no where-filter scans
+    stored_hashes = {}
+    stored_ids = {}
+    stored = collection.get(include=["metadatas"])
+    for doc_id, metadata in zip(stored["ids"], stored["metadatas"] or []):
+        if metadata and "source_file" in metadata:
+            stored_hashes[metadata["source_file"]] = metadata.get("content_sha1")
+            stored_ids.setdefault(metadata["source_file"], []).append(doc_id)
     
     # Find all PDFs
     pdf_files = []
@@ -117,17 +185,29 @@ def build_chromadb():
     print(f"📚 Found {len(pdf_files)} PDF files")
     
     all_documents = []
-    all_embeddings = []
     all_ids = []
     all_metadatas = []
     
     doc_counter = 0
+    skipped_files = 0
+    seen_files = set()
     
-    for pdf_file in pdf_files:
+    def flush():
+        """Embed and store the pending chunks"""
+        if all_documents:
+            print(f"\n💾 Adding {len(all_documents)} documents to ChromaDB...")
+            add_many_to_db(all_ids, all_documents, all_metadatas, collection=collection)
+            all_documents.clear()
+            all_ids.clear()
+            all_metadatas.clear()
+    
+    # PDFs are parsed in parallel worker processes; chunks are embedded and
+    # stored here in batches as files arrive, overlapping the two stages
+    print("🔄 Extracting text...")
+    for pdf_file, text in zip(pdf_files, iter_extract(pdf_files)):
         print(f"\n📄 Processing: {pdf_file.name}")
+        seen_files.add(pdf_file.name)
         
-        # Extract text
-        text = extract_text_from_pdf(pdf_file)
         if not text:
             print(f"⚠️  Skipping {pdf_file.name} (no text extracted)")
             continue
@@ -139,60 +219,62 @@ def build_chromadb():
         
         print(f"   Extracted {len(text)} characters")
         
+        # Unchanged since the last build: nothing to embed
+        content_sha1 = hashlib.sha1(text.encode()).hexdigest()
+        if stored_hashes.get(pdf_file.name) == content_sha1:
+            print("   ⏭️  Unchanged, already indexed")
+            skipped_files += 1
+            continue
+        if pdf_file.name in stored_hashes:
+            delete_source_from_db(collection, pdf_file.name, stored_ids[pdf_file.name])
+            print("   🗑️  Removed outdated chunks")
+        
         # Chunk the text
         chunks = chunk_text(text, chunk_size=1000, overlap=200)
         print(f"   Split into {len(chunks)} chunks")
         
+        # Fields shared by every chunk of this file, built once
+        base_metadata = {
+            "source_file": pdf_file.name,
+            "source_path": str(pdf_file),
+            "total_chunks": len(chunks),
+            "content_sha1": content_sha1
+        }
+        id_prefix = pdf_file.stem + "_"
+        
         # Process each chunk
         for chunk_idx, chunk in enumerate(chunks):
             if len(chunk.strip()) < 50:  # Skip very short chunks
                 continue
             
-            # Create embedding
-            embedding = model.encode(chunk, show_progress_bar=False)
-            
-            # Create unique ID
-            doc_id = f"{pdf_file.stem}_{chunk_idx}"
-            
-            # Create metadata
-            metadata = {
-                "source_file": pdf_file.name,
-                "source_path": str(pdf_file),
+            all_documents.append(chunk)
+            all_ids.append(id_prefix + str(chunk_idx))
+            all_metadatas.append({
+                **base_metadata,
                 "chunk_index": chunk_idx,
-                "total_chunks": len(chunks),
                 "chunk_length": len(chunk)
-            }
-            
-            all_documents.append(chunk)
-            all_embeddings.append(embedding.tolist())
-            all_ids.append(doc_id)
-            all_metadatas.append(metadata)
+            })
             
             doc_counter += 1
+        
+        if len(all_documents) >= INGEST_BATCH:
+            flush()
     
-    # Add all documents to ChromaDB in batches
-    print(f"\n💾 Adding {doc_counter} documents to ChromaDB...")
+    # Drop chunks of files that are no longer in data/raw
+    for source_file in set(stored_hashes) - seen_files:
+        delete_source_from_db(collection, source_file, stored_ids[source_file])
+        print(f"🗑️  Removed chunks of deleted file: {source_file}")
     
-    # ChromaDB can handle batch insertion
-    batch_size = 100
-    for i in range(0, len(all_documents), batch_size):
-        batch_docs = all_documents[i:i+batch_size]
-        batch_embeddings = all_embeddings[i:i+batch_size]
-        batch_ids = all_ids[i:i+batch_size]
-        batch_metadatas = all_metadatas[i:i+batch_size]
-        
-        collection.add(
-            documents=batch_docs,
-            embeddings=batch_embeddings,
-            ids=batch_ids,
-            metadatas=batch_metadatas
-        )
-        print(f"   Added batch {i//batch_size + 1} ({len(batch_docs)} documents)")
+    # Embed and add the remaining documents
+    flush()
+    print(f"\n⏭️  {skipped_files} unchanged file(s) skipped")
     
     print(f"\n✅ ChromaDB built successfully!")
     print(f"   📊 Total documents: {doc_counter}")
     print(f"   📁 Database path: {CHROMA_DB_PATH}")
     print(f"   📦 Collection: {COLLECTION_NAME}")
+    # Running API servers reload the collection on their next lookup
+    mark_collection_updated(CHROMA_DB_PATH)
     
     # Test query
     print("\n🔍 Testing search functionality...")
@@ -207,8 +289,10 @@ def build_chromadb():
 def search_chromadb(query, n_results=5):
     """Search ChromaDB for relevant content"""
     try:
-        client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
-        collection = client.get_collection(COLLECTION_NAME)
+        client = get_client(CHROMA_DB_PATH)
+        collection = client.get_collection(
+            COLLECTION_NAME, embedding_function=EMBEDDING_FUNCTION
+        )
         
         results = collection.query(
             query_texts=[query],
@@ -221,7 +305,7 @@ def search_chromadb(query, n_results=5):
         return None
 
 if __name__ == "__main__":
-    build_chromadb()
+    build_chromadb(rebuild="--rebuild" in sys.argv)
     
     # Example search
     print("\n" + "="*50)
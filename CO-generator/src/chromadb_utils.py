@@ -1,20 +1,443 @@
 """
 ChromaDB utility functions for searching syllabus content
 """
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
 import chromadb
+import numpy as np
 from pathlib import Path
 
 CHROMA_DB_PATH = "data/chroma_db"
 COLLECTION_NAME = "dbms_syllabus"
+CHROMA_BATCH = 128  # Documents per collection.add() call
 
-def get_collection():
-    """Get or create ChromaDB collection"""
-    client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
-    try:
-        collection = client.get_collection(COLLECTION_NAME)
+# Chroma >= 0.6 takes numpy embeddings directly; older clients require
+# Python lists, so those get converted one batch at a time
+_CHROMA_VERSION = tuple(int(part) for part in re.findall(r'\d+', chromadb.__version__)[:3])
+NUMPY_EMBEDDINGS = _CHROMA_VERSION >= (0, 6, 0)
+
+
+def to_chroma_embeddings(embeddings):
+    """Hand an embedding matrix (or slice) to Chroma without boxing floats when possible"""
+    return list(embeddings) if NUMPY_EMBEDDINGS else embeddings.tolist()
+
+# Embeddings are L2-normalized, so cosine is the natural HNSW distance
+COLLECTION_METADATA = {
+    "description": "DBMS Syllabus and Course Materials",
+    "hnsw:space": "cosine"
+}
+
+# Optional HNSW tuning, applied when a collection is created
+# (build_chromadb.py rebuilds when these differ). search_ef is the
+# recall/latency knob, like nprobe on an IVF index; unset keys keep
+# Chroma's defaults
+HNSW_ENV_PARAMS = {
+    "hnsw:M": "CHROMA_HNSW_M",
+    "hnsw:construction_ef": "CHROMA_HNSW_CONSTRUCTION_EF",
+    "hnsw:search_ef": "CHROMA_HNSW_SEARCH_EF",
+}
+COLLECTION_METADATA.update({
+    key: int(os.environ[env]) for key, env in HNSW_ENV_PARAMS.items() if os.getenv(env)
+})
+
+
+class SharedEmbeddingFunction:
+    """
+    Chroma embedding function backed by the shared embedder, so query_texts
+    are encoded by the same in-process model used at ingestion instead of
+    Chroma loading its own default model
+    """
+    
+    def __call__(self, input):
+        # Imported lazily so importing this module doesn't load the model
+        from embedder import get_embedder, EMBED_BATCH_SIZE
+        
+        return to_chroma_embeddings(get_embedder().encode(
+            list(input),
+            batch_size=EMBED_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ).astype('float32', copy=False))
+
+
+EMBEDDING_FUNCTION = SharedEmbeddingFunction()
+
+
+class QueryCache:
+    """
+    Thread-safe LRU + TTL cache for formatted search results, keyed by
+    (collection, query, n_results). Repeated queries (per-level CO context,
+    topic sweeps, dashboard refreshes) skip the embed + HNSW round-trip.
+    """
+    
+    def __init__(self, max_size: int = 2000, ttl_seconds: float = 300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        """Return cached results for key, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def set(self, key, results):
+        """Store results for key, evicting the least recently used entry"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), list(results))
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, collection_name=None):
+        """Drop all entries, or only those for one collection"""
+        with self._lock:
+            if collection_name is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == collection_name]:
+                del self._entries[key]
+    
+    def get_stats(self):
+        """Hit/miss counters for health reporting"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0
+            }
+
+
+QUERY_CACHE = QueryCache()
+
+# Document counts per collection, so stats don't issue a COUNT each time.
+# Filled on first request and kept current by add_many_to_db()
+_COUNT_CACHE = {}
+_COUNT_LOCK = threading.Lock()
+
+
+def get_document_count(collection=None):
+    """Number of documents in a collection (the syllabus one by default)"""
+    if collection is None:
+        collection = get_collection()
+        if collection is None:
+            return 0
+    with _COUNT_LOCK:
+        count = _COUNT_CACHE.get(collection.name)
+    if count is None:
+        count = collection.count()
+        with _COUNT_LOCK:
+            count = _COUNT_CACHE.setdefault(collection.name, count)
+    return count
+
+
+def invalidate_document_count(collection_name=None):
+    """Forget cached counts, e.g. after a collection is deleted"""
+    with _COUNT_LOCK:
+        if collection_name is None:
+            _COUNT_CACHE.clear()
+        else:
+            _COUNT_CACHE.pop(collection_name, None)
+
+
+class RamIndex:
+    """
+    Per-collection in-memory copy of the stored embeddings as one contiguous,
+    L2-normalized float32 matrix plus parallel id/document/metadata lists.
+    Cosine top-k is then a single matmul + argpartition instead of a Chroma
+    query. Loaded from Chroma on first use (cold start) and appended to at
+    ingest; collections above max_rows are left to Chroma's HNSW index.
+    """
+    
+    def __init__(self, max_rows: int = 10000):
+        self.max_rows = max_rows
+        self._indexes = {}
+        self._lock = threading.RLock()
+    
+    def load(self, collection):
+        """Return the index for collection, pulling it from Chroma if needed"""
+        with self._lock:
+            index = self._indexes.get(collection.name)
+            if index is not None:
+                return index
+            if get_document_count(collection) > self.max_rows:
+                return None
+            data = collection.get(include=["embeddings", "documents", "metadatas"])
+            matrix = np.asarray(data["embeddings"], dtype=np.float32)
+            if matrix.size:
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix = matrix / np.where(norms > 0, norms, 1.0)
+            index = {
+                'matrix': np.ascontiguousarray(matrix),
+                'ids': list(data["ids"]),
+                'documents': list(data["documents"]),
+                'metadatas': list(data["metadatas"] or [{}] * len(data["ids"]))
+            }
+            self._indexes[collection.name] = index
+            return index
+    
+    def append(self, name, ids, documents, metadatas, embeddings):
+        """Add freshly ingested rows to an already loaded index"""
+        with self._lock:
+            index = self._indexes.get(name)
+            if index is None:
+                return  # Not loaded yet; the next load() reads everything
+            if len(index['ids']) + len(ids) > self.max_rows:
+                del self._indexes[name]
+                return
+            rows = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+            if index['matrix'].size:
+                rows = np.vstack([index['matrix'], rows])
+            index['matrix'] = np.ascontiguousarray(rows)
+            index['ids'].extend(ids)
+            index['documents'].extend(documents)
+            index['metadatas'].extend(metadatas or [{}] * len(ids))
+    
+    def drop(self, name=None):
+        """Forget one collection's index, or all of them"""
+        with self._lock:
+            if name is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(name, None)
+    
+    @staticmethod
+    def search(index, query_embedding, n_results):
+        """Cosine top-k over the index, formatted like search_syllabus results"""
+        matrix = index['matrix']
+        if not matrix.size:
+            return []
+        scores = matrix @ np.asarray(query_embedding, dtype=np.float32)
+        k = min(n_results, len(scores))
+        if k <= 0:
+            return []
+        # O(N) selection of the k best, then sort only those k
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(k)
+        top = top[np.argsort(-scores[top], kind='stable')]
+        # Cosine distances (as Chroma reports them) for all k rows in one
+        # vector op and one tolist(), instead of a numpy scalar per row
+        distances = (1.0 - scores[top].astype(np.float64)).tolist()
+        documents, metadatas = index['documents'], index['metadatas']
+        return [{
+            'content': documents[i],
+            'metadata': metadatas[i] or {},
+            'distance': distance
+        } for i, distance in zip(top.tolist(), distances)]
+
+
+RAM_INDEX = RamIndex()
+
+# Client and collection handles are reused across calls instead of being
+# reopened every time; only successful lookups are memoized
+_CLIENTS = {}
+_COLLECTIONS = {}
+_HANDLE_LOCK = threading.Lock()
+
+
+def get_client(path=CHROMA_DB_PATH):
+    """Shared PersistentClient for a database path"""
+    with _HANDLE_LOCK:
+        client = _CLIENTS.get(path)
+        if client is None:
+            client = _CLIENTS[path] = chromadb.PersistentClient(path=path)
+        return client
+
+
+def get_collection(name=COLLECTION_NAME, create=False):
+    """Get (or with create=True, get or create) a ChromaDB collection"""
+    refresh_if_rebuilt()
+    with _HANDLE_LOCK:
+        collection = _COLLECTIONS.get(name)
+    if collection is not None:
         return collection
+    client = get_client()
+    try:
+        if create:
+            collection = client.get_or_create_collection(
+                name,
+                metadata=COLLECTION_METADATA,
+                embedding_function=EMBEDDING_FUNCTION
+            )
+        else:
+            collection = client.get_collection(
+                name, embedding_function=EMBEDDING_FUNCTION
+            )
     except:
         return None
+    with _HANDLE_LOCK:
+        return _COLLECTIONS.setdefault(name, collection)
+
+
+def forget_collection(name=None):
+    """Drop memoized handles and caches after a collection is deleted"""
+    with _HANDLE_LOCK:
+        if name is None:
+            _COLLECTIONS.clear()
+        else:
+            _COLLECTIONS.pop(name, None)
+    invalidate_document_count(name)
+    RAM_INDEX.drop(name)
+    QUERY_CACHE.invalidate(name)
+
+# build_chromadb.py runs in its own process, so it can't reach this one's
+# handles and caches. It touches a stamp file in the database directory
+# when it finishes; readers compare the stamp (one stat per lookup) and
+# drop everything derived from the old collection when it changes
+BUILD_STAMP_NAME = ".build_stamp"
+_UNSEEN = object()
+_seen_stamp = _UNSEEN
+_STAMP_LOCK = threading.Lock()
+
+
+def _build_stamp_path(path=CHROMA_DB_PATH):
+    return Path(path) / BUILD_STAMP_NAME
+
+
+def _read_build_stamp(path=CHROMA_DB_PATH):
+    try:
+        return os.stat(_build_stamp_path(path)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def mark_collection_updated(path=CHROMA_DB_PATH):
+    """Record that the database was rebuilt, for other processes to notice"""
+    stamp = _build_stamp_path(path)
+    stamp.parent.mkdir(parents=True, exist_ok=True)
+    stamp.write_text(str(time.time_ns()))
+
+
+def refresh_if_rebuilt():
+    """Drop memoized handles, counts, RAM indexes and cached results if the stamp moved"""
+    global _seen_stamp
+    current = _read_build_stamp()
+    with _STAMP_LOCK:
+        if current == _seen_stamp:
+            return
+        first_check, _seen_stamp = _seen_stamp is _UNSEEN, current
+    if not first_check:
+        print("🔄 ChromaDB was rebuilt; reloading collection")
+        forget_collection()
+
+def chunk_words(text, size=200, overlap=40):
+    """
+    Split text into overlapping word windows that fit MiniLM's 256-token
+    input limit (anything longer is silently truncated by the encoder)
+    """
+    words = text.split()
+    if len(words) <= size:
+        return [text]
+    step = size - overlap
+    return [" ".join(words[i:i + size]) for i in range(0, len(words) - overlap, step)]
+
+def add_many_to_db(ids, texts, metadatas=None, collection=None, batch_size=CHROMA_BATCH):
+    """
+    Embed and add many documents to ChromaDB in batched calls
+    
+    Args:
+        ids: Unique document IDs
+        texts: Document texts (same order as ids)
+        metadatas: Optional metadata dicts (same order as ids)
+        collection: Target collection (defaults to the syllabus collection)
+        batch_size: Number of documents per collection.add() call
+    
+    Returns:
+        Number of documents added
+    
+    Texts longer than the encoder window are split with chunk_words() and
+    stored as "<id>#<n>" entries with a "sub_chunk" metadata field.
+    """
+    if not texts:
+        return 0
+    
+    # Expand over-long documents into window-sized chunks
+    chunk_ids, chunk_texts, chunk_metadatas = [], [], []
+    for idx, (doc_id, text) in enumerate(zip(ids, texts)):
+        metadata = metadatas[idx] if metadatas else None
+        pieces = chunk_words(text)
+        if len(pieces) == 1:
+            chunk_ids.append(doc_id)
+            chunk_texts.append(text)
+            chunk_metadatas.append(metadata)
+            continue
+        for n, piece in enumerate(pieces):
+            chunk_ids.append(f"{doc_id}#{n}")
+            chunk_texts.append(piece)
+            chunk_metadatas.append({**(metadata or {}), "sub_chunk": n})
+    ids, texts = chunk_ids, chunk_texts
+    metadatas = chunk_metadatas if any(m is not None for m in chunk_metadatas) else None
+    
+    if collection is None:
+        collection = get_collection(create=True)
+    
+    # Imported lazily so search-only callers don't load the embedding model
+    from embedder import encode_parallel
+    
+    # One encode pass for all texts (sharded over CPU threads when large).
+    # Kept as a float32 ndarray; only each add() slice is converted
+    embeddings = encode_parallel(texts)
+    
+    for i in range(0, len(texts), batch_size):
+        batch = {
+            'ids': ids[i:i + batch_size],
+            'documents': texts[i:i + batch_size],
+            'embeddings': to_chroma_embeddings(embeddings[i:i + batch_size])
+        }
+        if metadatas:
+            # Chroma rejects empty metadata dicts, so fill any gaps
+            batch['metadatas'] = [
+                m if m else {"sub_chunk": 0} for m in metadatas[i:i + batch_size]
+            ]
+        collection.add(**batch)
+        print(f"   Added batch {i // batch_size + 1} ({len(batch['ids'])} documents)")
+    
+    # Keep the count and in-memory copy in step, then drop cached rankings
+    with _COUNT_LOCK:
+        if collection.name in _COUNT_CACHE:
+            _COUNT_CACHE[collection.name] += len(texts)
+    RAM_INDEX.append(
+        collection.name, ids, texts,
+        [m if m else {"sub_chunk": 0} for m in metadatas] if metadatas else None,
+        embeddings
+    )
+    QUERY_CACHE.invalidate(collection.name)
+    return len(texts)
+
+def delete_source_from_db(collection, source_file, ids=None):
+    """
+    Remove every chunk of one source file and drop the derived caches
+    
+    Deletes by id: pass the chunk ids if known, otherwise they are found by
+    reading this collection's metadata and filtering in Python, avoiding
+    Chroma's where-filter path (a metadata scan across all collections)
+    """
+    if ids is None:
+        data = collection.get(include=["metadatas"])
+        ids = [
+            doc_id for doc_id, metadata in zip(data["ids"], data["metadatas"] or [])
+            if metadata and metadata.get("source_file") == source_file
+        ]
+    if ids:
+        collection.delete(ids=list(ids))
+    invalidate_document_count(collection.name)
+    RAM_INDEX.drop(collection.name)
+    QUERY_CACHE.invalidate(collection.name)
 
 def search_syllabus(query, n_results=5):
     """
@@ -27,30 +450,63 @@ def search_syllabus(query, n_results=5):
     Returns:
         List of relevant document chunks with metadata
     """
-    collection = get_collection()
-    if not collection:
-        return []
+    cache_key = (COLLECTION_NAME, query, n_results)
+    cached = QUERY_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
     
+    for attempt in range(2):
+        collection = get_collection()
+        if not collection:
+            return []
+        try:
+            formatted_results = _search_collection(collection, query, n_results)
+        except Exception as e:
+            # Usually a handle to a collection that an out-of-process rebuild
+            # deleted: drop the memoized handle, index and counts, retry once
+            forget_collection(collection.name)
+            if attempt:
+                print(f"Error searching ChromaDB: {e}")
+                return []
+            continue
+        QUERY_CACHE.set(cache_key, formatted_results)
+        return formatted_results
+
+def _search_collection(collection, query, n_results):
+    """In-memory top-k when the collection fits, else a Chroma query (raises on failure)"""
+    query_embedding = None
     try:
+        index = RAM_INDEX.load(collection)
+        if index is not None:
+            query_embedding = EMBEDDING_FUNCTION([query])[0]
+            return RamIndex.search(index, query_embedding, n_results)
+    except Exception as e:
+        print(f"⚠️ In-memory search failed, falling back to ChromaDB: {e}")
+        RAM_INDEX.drop(collection.name)
+    
+    # Reuse the embedding from the in-memory attempt (if any) so the
+    # fallback doesn't run the encoder a second time
+    if query_embedding is not None:
+        results = collection.query(
+            query_embeddings=[query_embedding],
+            n_results=n_results
+        )
+    else:
         results = collection.query(
             query_texts=[query],
             n_results=n_results
         )
-        
-        # Format results
-        formatted_results = []
-        if results['documents'] and len(results['documents'][0]) > 0:
-            for i in range(len(results['documents'][0])):
-                formatted_results.append({
-                    'content': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
-                    'distance': results['distances'][0][i] if results['distances'] else None
-                })
-        
-        return formatted_results
-    except Exception as e:
-        print(f"Error searching ChromaDB: {e}")
-        return []
+    
+    # Format results
+    formatted_results = []
+    if results['documents'] and len(results['documents'][0]) > 0:
+        for i in range(len(results['documents'][0])):
+            formatted_results.append({
+                'content': results['documents'][0][i],
+                'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
+                'distance': results['distances'][0][i] if results['distances'] else None
+            })
+    return formatted_results
 
 def get_relevant_content_for_co(co_num, level, previous_cos=None):
     """
@@ -12,6 +12,7 @@ With proper CO storage, explainability, and Neo4j integration.
 """
 
 import os
+import re
 import sys
 import json
 import time
@@ -29,6 +30,22 @@ from graph_rag import GraphRAGRetrieval
 from refinement_layer import RefinementLayer
 from metrics_evaluation import MetricsEvaluator
 
+# Case-insensitive context probes, compiled once; searching with IGNORECASE
+# avoids building a lowercased copy of the retrieval context for each check
+_SQL_RE = re.compile(r'sql', re.IGNORECASE)
+_NORMALIZATION_RE = re.compile(r'normalization', re.IGNORECASE)
+_TOPIC_KEYWORDS = {
+    'SQL': ['sql', 'query', 'select'],
+    'Normalization': ['normalization', 'normal form', '3nf'],
+    'Transaction Management': ['transaction', 'acid', 'concurrency'],
+    'ER Modeling': ['er model', 'entity', 'relationship'],
+    'Database Design': ['database design', 'schema']
+}
+_TOPIC_RES = tuple(
+    (topic, re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE))
+    for topic, keywords in _TOPIC_KEYWORDS.items()
+)
+
 
 class COStorage:
     """Persistent storage for generated COs with full metadata"""
@@ -356,9 +373,9 @@ class CompleteCOPipeline:
 
         # Extract subject from context
         subject = "database management"
-        if "sql" in context.lower():
+        if _SQL_RE.search(context):
             subject = "SQL and database"
-        elif "normalization" in context.lower():
+        elif _NORMALIZATION_RE.search(context):
             subject = "normalization and database design"
 
         co_text = f"CO{co_num} {template.format(subject=subject)}"
@@ -381,20 +398,13 @@ class CompleteCOPipeline:
     def _extract_topics_from_context(self, context: str) -> List[str]:
         """Extract topics from retrieval context"""
         topics = []
-        topic_keywords = {
-            'SQL': ['sql', 'query', 'select'],
-            'Normalization': ['normalization', 'normal form', '3nf'],
-            'Transaction Management': ['transaction', 'acid', 'concurrency'],
-            'ER Modeling': ['er model', 'entity', 'relationship'],
-            'Database Design': ['database design', 'schema']
-        }
-
-        context_lower = context.lower()
-        for topic, keywords in topic_keywords.items():
-            if any(kw in context_lower for kw in keywords):
+        for topic, pattern in _TOPIC_RES:
+            if pattern.search(context):
                 topics.append(topic)
+                if len(topics) == 3:
+                    break
 
-        return topics[:3]
+        return topics
 
     def run_complete_pipeline(self,
                               file_paths: List[str],
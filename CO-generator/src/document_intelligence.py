@@ -3,10 +3,26 @@ Document Intelligence Layer
 Advanced document processing with semantic chunking and embedding
 """
 import re
+from operator import attrgetter
 from typing import List, Dict, Tuple
-from sentence_transformers import SentenceTransformer
+from embedder import get_embedder, encode_parallel
 import numpy as np
 
+# Technical terms reported in document metadata (in report order)
+METADATA_KEYWORDS = ('SQL', 'normalization', 'transaction', 'database', 'schema',
+                     'ER model', 'relational algebra', 'indexing', 'constraints')
+# One case-insensitive scan finds every keyword instead of lowercasing the
+# whole document once per keyword
+_KEYWORD_RE = re.compile(
+    '|'.join(re.escape(kw) for kw in sorted(METADATA_KEYWORDS, key=len, reverse=True)),
+    re.IGNORECASE
+)
+_KEYWORD_MAP = {kw.lower(): kw for kw in METADATA_KEYWORDS}
+_MODULE_RE = re.compile(r'(?:module|unit|chapter)\s*[0-9]+[:\-]?\s*([^\n]+)', re.IGNORECASE)
+_CONTROL_RE = re.compile(r'[\x00-\x08\x0e-\x1b]')  # \s already covers \x0b-\x0c, \x1c-\x1f
+_WS_RE = re.compile(r'\s+')
+_PAGE_RE = re.compile(r'Page \d+', re.IGNORECASE)
+
 class DocumentIntelligence:
     """
     Advanced document processing pipeline:
@@ -18,7 +34,7 @@ class DocumentIntelligence:
     
     def __init__(self, embedding_model='all-MiniLM-L6-v2'):
         """Initialize with embedding model"""
-        self.embedding_model = SentenceTransformer(embedding_model)
+        self.embedding_model = get_embedder(embedding_model)
         print(f"Document Intelligence Layer initialized with {embedding_model}")
     
     def extract_text(self, file_path: str) -> str:
@@ -36,16 +52,18 @@ class DocumentIntelligence:
                 text = "\n".join([page.extract_text() for page in reader.pages])
             elif file_lower.endswith(('.ppt', '.pptx')):
                 prs = Presentation(file_path)
-                for slide in prs.slides:
-                    for shape in slide.shapes:
-                        if hasattr(shape, "text"):
-                            text += shape.text + "\n"
+                text = "".join(
+                    shape.text_frame.text + "\n"
+                    for slide in prs.slides
+                    for shape in slide.shapes
+                    if getattr(shape, "has_text_frame", False)
+                )
             elif file_lower.endswith(('.doc', '.docx')):
                 doc = docx.Document(file_path)
-                text = "\n".join([para.text for para in doc.paragraphs])
+                text = "\n".join(map(attrgetter('text'), doc.paragraphs))
             elif file_lower.endswith('.txt'):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
+                with open(file_path, 'rb') as f:
+                    text = f.read().decode('utf-8')
         except Exception as e:
             print(f" Error extracting {file_path}: {e}")
         
@@ -53,12 +71,13 @@ class DocumentIntelligence:
     
     def clean_text(self, text: str) -> str:
         """Advanced text cleaning"""
+        # Remove special control characters first, so the whitespace pass
+        # below is the only one and leaves no doubled spaces behind
+        text = _CONTROL_RE.sub('', text)
         # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Remove special control characters
-        text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f]', '', text)
+        text = _WS_RE.sub(' ', text)
         # Remove page numbers and headers
-        text = re.sub(r'Page \d+', '', text, flags=re.IGNORECASE)
+        text = _PAGE_RE.sub('', text)
         # Normalize unicode
         text = text.encode('ascii', 'ignore').decode('ascii')
         return text.strip()
@@ -125,11 +144,13 @@ class DocumentIntelligence:
     def generate_embeddings(self, chunks: List[Dict]) -> List[Dict]:
         """Generate embeddings for all chunks"""
         texts = [chunk['text'] for chunk in chunks]
-        embeddings = self.embedding_model.encode(texts, show_progress_bar=True)
+        embeddings = encode_parallel(texts, model=self.embedding_model)
         
+        # Keep each chunk's embedding as a row of the float32 matrix
+        # instead of boxing every value into a Python list
         for i, chunk in enumerate(chunks):
-            chunk['embedding'] = embeddings[i].tolist()
-            chunk['embedding_dim'] = len(embeddings[i])
+            chunk['embedding'] = embeddings[i]
+            chunk['embedding_dim'] = embeddings.shape[1]
         
         return chunks
     
@@ -145,8 +166,7 @@ class DocumentIntelligence:
         }
         
         # Extract modules/units
-        module_pattern = r'(?:module|unit|chapter)\s*[0-9]+[:\-]?\s*([^\n]+)'
-        modules = re.findall(module_pattern, text, re.IGNORECASE)
+        modules = _MODULE_RE.findall(text)
         metadata['modules'] = [m.strip() for m in modules[:10]]
         
         # Extract topics (headings)
@@ -162,10 +182,12 @@ class DocumentIntelligence:
                     break
         
         # Extract keywords (technical terms)
-        keywords = ['SQL', 'normalization', 'transaction', 'database', 'schema', 
-                   'ER model', 'relational algebra', 'indexing', 'constraints']
-        found_keywords = [kw for kw in keywords if kw.lower() in text.lower()]
-        metadata['keywords'] = found_keywords
+        found = set()
+        for match in _KEYWORD_RE.finditer(text):
+            found.add(_KEYWORD_MAP[match.group(0).lower()])
+            if len(found) == len(METADATA_KEYWORDS):
+                break
+        metadata['keywords'] = [kw for kw in METADATA_KEYWORDS if kw in found]
         
         return metadata
     
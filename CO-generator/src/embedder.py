@@ -0,0 +1,154 @@
+"""
+Shared Embedding Model
+======================
+Single cached SentenceTransformer instance shared by every module that
+needs sentence embeddings (ChromaDB build, Graph-RAG, metrics, document
+intelligence), so the weights are loaded into memory only once.
+
+On CUDA the model runs in FP16. On CPU, EMBEDDER_INT8=1 dynamically
+quantizes its Linear layers to int8; this is opt-in because existing
+collections hold FP32 embeddings, so rebuild them (build_chromadb.py
+--rebuild) after switching or queries won't match the stored vectors.
+Large CPU encodes can be sharded across threads with encode_parallel(),
+and very large ones across worker processes (set EMBEDDER_PROCESSES=0 to
+disable the process pool).
+"""
+
+import os
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+DEFAULT_EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+EMBED_BATCH_SIZE = 64  # Batch size for encode() calls
+MIN_SHARD_SIZE = 256   # Below this many texts per shard, threading isn't worth it
+MULTI_PROCESS_MIN_TEXTS = 2048  # Process pool start-up only pays off for big ingests
+
+_process_pool = None  # (model, pool) from start_multi_process_pool()
+_process_pool_lock = threading.Lock()
+
+
+def _get_device() -> str:
+    """Pick the device used for the embedding model"""
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return 'cuda'
+    except ImportError:
+        pass
+    return 'cpu'
+
+
+def _quantize_int8(model: SentenceTransformer) -> SentenceTransformer:
+    """Apply dynamic int8 quantization to the model's Linear layers"""
+    try:
+        import torch
+        model = torch.quantization.quantize_dynamic(
+            model,
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+        print("✅ Embedding model quantized to int8")
+    except Exception as e:
+        print(f"⚠️ Embedding quantization failed: {e}")
+    return model
+
+
+@lru_cache(maxsize=4)
+def get_embedder(name: str = DEFAULT_EMBEDDING_MODEL) -> SentenceTransformer:
+    """Load (once) and return the SentenceTransformer for `name`"""
+    print(f"🔄 Loading embedding model {name}...")
+    device = _get_device()
+    model = SentenceTransformer(name, device=device)
+    if device == 'cuda':
+        model.half()  # FP16 tensor-core inference
+    elif os.getenv("EMBEDDER_INT8", "0") == "1":
+        model = _quantize_int8(model)
+    return model
+
+
+def _cpu_workers() -> int:
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def get_process_pool(model: SentenceTransformer):
+    """Start (once) a multi-process encode pool for model, or None if unavailable"""
+    global _process_pool
+    if os.getenv("EMBEDDER_PROCESSES", "1") == "0":
+        return None
+    with _process_pool_lock:
+        if _process_pool is not None:
+            return _process_pool[1] if _process_pool[0] is model else None
+        try:
+            pool = model.start_multi_process_pool(target_devices=['cpu'] * _cpu_workers())
+        except Exception as e:
+            print(f"⚠️ Could not start embedding process pool: {e}")
+            return None
+        _process_pool = (model, pool)
+        print(f"✅ Embedding process pool started ({_cpu_workers()} workers)")
+        return pool
+
+
+def close_process_pool():
+    """Stop the embedding process pool, if one was started"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            SentenceTransformer.stop_multi_process_pool(_process_pool[1])
+            _process_pool = None
+
+
+atexit.register(close_process_pool)
+
+
+def encode_parallel(texts, model: SentenceTransformer = None,
+                    batch_size: int = EMBED_BATCH_SIZE,
+                    normalize: bool = True) -> np.ndarray:
+    """
+    Encode texts into a float32 matrix, splitting large CPU jobs into shards
+    encoded on a thread pool (the torch forward pass releases the GIL).
+    Very large CPU jobs go to a worker-process pool instead, avoiding GIL
+    contention entirely. On CUDA a single call already saturates the device,
+    so no sharding.
+    """
+    model = model or get_embedder()
+    texts = list(texts)
+    on_cuda = _get_device() == 'cuda'
+
+    if not on_cuda and len(texts) >= MULTI_PROCESS_MIN_TEXTS:
+        pool = get_process_pool(model)
+        if pool is not None:
+            try:
+                return np.asarray(model.encode_multi_process(
+                    texts,
+                    pool,
+                    batch_size=batch_size,
+                    normalize_embeddings=normalize
+                ), dtype=np.float32)
+            except Exception as e:
+                print(f"⚠️ Process-pool encode failed, using threads: {e}")
+
+    def encode(shard):
+        return model.encode(
+            shard,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=normalize,
+            show_progress_bar=False
+        )
+
+    workers = 1 if on_cuda else _cpu_workers()
+    shards = min(workers, len(texts) // MIN_SHARD_SIZE)
+    if shards <= 1:
+        return encode(texts).astype(np.float32, copy=False)
+
+    bounds = np.linspace(0, len(texts), shards + 1, dtype=int)
+    with ThreadPoolExecutor(max_workers=shards) as executor:
+        parts = list(executor.map(
+            encode, [texts[bounds[i]:bounds[i + 1]] for i in range(shards)]
+        ))
+    return np.concatenate(parts).astype(np.float32, copy=False)
@@ -12,9 +12,13 @@ Production-ready pipeline with:
 """
 
 import os
+import re
 import sys
 import time
 import json
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, asdict
@@ -39,13 +43,66 @@ except ImportError:
     TORCH_AVAILABLE = False
     print("⚠️ PyTorch not available - running in demo mode")
 
+# Optional: 8-bit weights on CUDA (pip install bitsandbytes)
 try:
-    from sentence_transformers import SentenceTransformer
-    import chromadb
+    import bitsandbytes  # noqa: F401
+    from transformers import BitsAndBytesConfig
+    BNB_AVAILABLE = True
+except ImportError:
+    BNB_AVAILABLE = False
+
+# CO_MODEL_QUANT=int8 loads the generator with int8 weights (bitsandbytes on
+# CUDA, dynamic quantization on CPU)
+MODEL_QUANT = os.getenv("CO_MODEL_QUANT", "").lower()
+
+try:
+    from embedder import get_embedder
+    from chromadb_utils import EMBEDDING_FUNCTION, get_client
     EMBEDDINGS_AVAILABLE = True
 except ImportError:
     EMBEDDINGS_AVAILABLE = False
 
+# Output-parsing patterns, compiled once at import
+_LEVEL_PREFIX_RE = re.compile(r'^(Apply|Analyze|Evaluate|Create)\s+', re.IGNORECASE)
+_PO_MAPPINGS_RE = re.compile(r"PO[:\s]*Mappings?[:\s]*([^\n]+)", re.IGNORECASE)
+_CO_FORMAT_RE = re.compile(r'^CO[1-6]\s+[A-Z]')
+
+
+def _verb_matcher(verbs) -> "re.Pattern":
+    """Compile verbs into one alternation matching any of them as a substring"""
+    return re.compile('|'.join(map(re.escape, verbs)))
+
+
+@lru_cache(maxsize=16)
+def _co_line_re(co_num: int):
+    """Compiled 'CO<n>: text' pattern for one CO number"""
+    # Only the 'CO' letters vary in case; spelling them out avoids IGNORECASE
+    # case-folding on every character scanned
+    return re.compile(rf"[Cc][Oo]{co_num}[:\s]+([^\n]+)")
+
+GENERATION_CACHE_SIZE = 256  # Parsed generations kept per model instance
+
+# Static instructions go first and the per-CO details last, so the prompt
+# prefix is identical across CO1-CO6 and prefix/KV caching can reuse it
+CO_PROMPT_HEADER = """Generate a Course Outcome (CO) for the syllabus below.
+Each CO must be 15-20 words, specific and measurable.
+
+"""
+CO_PROMPT_TEMPLATE = CO_PROMPT_HEADER + """CONTEXT:
+{context}
+
+REQUIREMENTS:
+- CO{co_num} at {bloom_level} Bloom level
+- Must be unique from:
+{previous_text}
+
+FORMAT:
+CO{co_num}: [CO text]
+Bloom Level: {bloom_level}
+PO Mappings: PO1, PO2, PO3
+
+CO{co_num}:"""
+
 # ============================================================================
 # ENHANCED KNOWLEDGE GRAPH (Neo4j-Ready)
 # ============================================================================
@@ -261,14 +318,16 @@ class EnhancedGraphRAG:
         
         # Initialize embedding model
         if EMBEDDINGS_AVAILABLE:
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.embedding_model = get_embedder()
         else:
             self.embedding_model = None
         
         # Connect to ChromaDB
         try:
-            self.client = chromadb.PersistentClient(path=chroma_path)
-            self.collection = self.client.get_collection(collection_name)
+            self.client = get_client(chroma_path)
+            self.collection = self.client.get_collection(
+                collection_name, embedding_function=EMBEDDING_FUNCTION
+            )
             self.vector_db_ready = True
             print(f"✅ ChromaDB connected: {collection_name}")
         except Exception as e:
@@ -318,11 +377,13 @@ class EnhancedGraphRAG:
         paths = self.knowledge_graph.find_paths(start_type, end_type, max_depth=2)
         
         # Get relevant nodes based on query
-        query_lower = query.lower()
+        # Split the query once (deduplicated), not once per node
+        query_words = tuple(dict.fromkeys(query.lower().split()))
+        dumps = json.dumps
         relevant_nodes = []
         for node in self.knowledge_graph.graph_data['nodes']:
-            node_text = json.dumps(node['properties']).lower()
-            if any(word in node_text for word in query_lower.split()):
+            node_text = dumps(node['properties']).lower()
+            if any(word in node_text for word in query_words):
                 relevant_nodes.append(node)
         
         return {
@@ -402,6 +463,7 @@ class EnhancedMultiTaskModel:
         self.lora_path = lora_path
         self.model = None
         self.tokenizer = None
+        self._generation_cache = OrderedDict()  # prompt hash -> parsed result
         
         # Get optimizer
         self.optimizer = ModelOptimizer()
@@ -423,11 +485,19 @@ class EnhancedMultiTaskModel:
             if self.tokenizer.pad_token is None:
                 self.tokenizer.pad_token = self.tokenizer.eos_token
             
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.base_model_name,
-                torch_dtype=torch.float32,
-                device_map=None
-            )
+            use_bnb_int8 = MODEL_QUANT == "int8" and self.device == "cuda" and BNB_AVAILABLE
+            if use_bnb_int8:
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.base_model_name,
+                    quantization_config=BitsAndBytesConfig(load_in_8bit=True),
+                    device_map={"": 0}
+                )
+            else:
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.base_model_name,
+                    torch_dtype=self.optimizer.get_torch_dtype(),
+                    device_map=None
+                )
             
             # Load LoRA adapter
             if self.lora_path and os.path.exists(self.lora_path):
@@ -435,8 +505,17 @@ class EnhancedMultiTaskModel:
                 print(f"✅ LoRA adapter loaded: {self.lora_path}")
             
             # Move to device and optimize
-            self.model.to(self.device)
-            self.model = self.optimizer.optimize_model_for_inference(self.model)
+            if not use_bnb_int8:
+                self.model.to(self.device)
+            if MODEL_QUANT == "int8" and self.device == "cpu":
+                if isinstance(self.model, PeftModel):
+                    # Fold the adapter into the base weights before quantizing
+                    self.model = self.model.merge_and_unload()
+                self.model = self.optimizer.quantize_model_int8(self.model)
+            # bitsandbytes int8 layers don't compile cleanly
+            self.model = self.optimizer.optimize_model_for_inference(
+                self.model, compile_model=not use_bnb_int8
+            )
             self.model.eval()
             
             print(f"✅ Model ready on {self.device}")
@@ -454,23 +533,21 @@ class EnhancedMultiTaskModel:
         # Build prompt
         previous_text = "\n".join([f"- {co}" for co in previous_cos]) if previous_cos else "None"
         
-        prompt = f"""Generate Course Outcome CO{co_num} at {bloom_level} level.
-
-CONTEXT:
-{context[:1500]}
-
-REQUIREMENTS:
-- CO{co_num} at {bloom_level} Bloom level
-- 15-20 words, specific and measurable
-- Must be unique from:
-{previous_text}
-
-FORMAT:
-CO{co_num}: [CO text]
-Bloom Level: {bloom_level}
-PO Mappings: PO1, PO2, PO3
-
-CO{co_num}:"""
+        prompt = CO_PROMPT_TEMPLATE.format(
+            context=context[:1500],
+            co_num=co_num,
+            bloom_level=bloom_level,
+            previous_text=previous_text
+        )
+        
+        # Same model + same prompt: reuse the parsed result instead of regenerating
+        cache_key = hashlib.blake2b(
+            f"{self.base_model_name}|{self.lora_path}|{prompt}".encode(), digest_size=16
+        ).hexdigest()
+        cached = self._generation_cache.get(cache_key)
+        if cached is not None:
+            self._generation_cache.move_to_end(cache_key)
+            return dict(cached)
         
         try:
             inputs = self.tokenizer(
@@ -493,7 +570,11 @@ CO{co_num}:"""
                 )
             
             generated = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            return self._parse_output(generated, co_num, bloom_level)
+            result = self._parse_output(generated, co_num, bloom_level)
+            self._generation_cache[cache_key] = dict(result)
+            if len(self._generation_cache) > GENERATION_CACHE_SIZE:
+                self._generation_cache.popitem(last=False)
+            return result
             
         except Exception as e:
             print(f"Generation error: {e}")
@@ -501,19 +582,15 @@ CO{co_num}:"""
     
     def _parse_output(self, text: str, co_num: int, bloom_level: str) -> Dict:
         """Parse model output"""
-        import re
-        
         # Extract CO text
-        co_pattern = rf"CO{co_num}[:\s]+([^\n]+)"
-        co_match = re.search(co_pattern, text, re.IGNORECASE)
+        co_match = _co_line_re(co_num).search(text)
         co_text = co_match.group(1).strip() if co_match else f"Generated CO{co_num}"
         
         # Clean up
-        co_text = re.sub(r'^(Apply|Analyze|Evaluate|Create)\s+', '', co_text, flags=re.IGNORECASE)
+        co_text = _LEVEL_PREFIX_RE.sub('', co_text)
         
         # Extract PO mappings
-        po_pattern = r"PO[:\s]*Mappings?[:\s]*([^\n]+)"
-        po_match = re.search(po_pattern, text, re.IGNORECASE)
+        po_match = _PO_MAPPINGS_RE.search(text)
         po_mappings = po_match.group(1).strip() if po_match else "PO1, PO2, PO3"
         
         return {
@@ -552,6 +629,31 @@ class EnhancedRefinementLayer:
     Simulates RLHF preference scoring
     """
     
+    # Term lists used by refine_and_score (shared by all instances, built once)
+    SPECIFIC_TERMS = ('sql', 'database', 'normalization', 'transaction',
+                      'query', 'schema', 'mongodb', 'index')
+    MEASURABLE_VERBS = ('apply', 'analyse', 'analyze', 'evaluate', 'create',
+                        'design', 'implement', 'demonstrate', 'conduct')
+    _MEASURABLE_VERB_RE = _verb_matcher(MEASURABLE_VERBS)
+    TECHNICAL_TERMS = ('sql', 'relational', 'normalization', 'transaction',
+                       'acid', 'mongodb', 'nosql', 'indexing', 'query',
+                       'schema', 'erd', 'constraint', 'trigger')
+    VTU_ACTION_VERBS = {
+        'Apply': ('apply', 'use', 'implement', 'demonstrate', 'execute'),
+        'Analyze': ('analyze', 'analyse', 'examine', 'compare', 'investigate'),
+        'Evaluate': ('evaluate', 'assess', 'justify', 'validate', 'critique'),
+        'Create': ('create', 'design', 'develop', 'construct', 'write')
+    }
+    # One alternation per verb list, compiled once per process (not per
+    # instance), so each check is a single scan of the CO text rather than
+    # one substring scan per verb
+    _ACTION_VERB_RE = _verb_matcher(
+        verb for verbs in VTU_ACTION_VERBS.values() for verb in verbs
+    )
+    _BLOOM_VERB_RE = {
+        level: _verb_matcher(verbs) for level, verbs in VTU_ACTION_VERBS.items()
+    }
+    
     def __init__(self):
         self.reward_weights = {
             'conciseness': 0.20,
@@ -561,26 +663,20 @@ class EnhancedRefinementLayer:
             'specificity': 0.10
         }
         
-        self.vtu_action_verbs = {
-            'Apply': ['apply', 'use', 'implement', 'demonstrate', 'execute'],
-            'Analyze': ['analyze', 'analyse', 'examine', 'compare', 'investigate'],
-            'Evaluate': ['evaluate', 'assess', 'justify', 'validate', 'critique'],
-            'Create': ['create', 'design', 'develop', 'construct', 'write']
-        }
+        self.vtu_action_verbs = self.VTU_ACTION_VERBS
     
     @PROFILER.profile("refinement")
     def refine_and_score(self, co_result: Dict, 
                          retrieval_context: Dict,
                          graph_paths: List) -> Dict:
         """Comprehensive CO refinement with reward scoring"""
-        import re
-        
         co_text = co_result.get('co_text', '')
         bloom_level = co_result.get('bloom_level', '')
         po_mappings = co_result.get('po_mappings', '')
         
         # Calculate individual scores
         scores = {}
+        co_lower = co_text.lower()
         
         # 1. Conciseness score
         word_count = len(co_text.split())
@@ -592,41 +688,26 @@ class EnhancedRefinementLayer:
             scores['conciseness'] = max(0.3, 1 - abs(word_count - 17.5) / 20)
         
         # 2. VTU compliance score
+        bloom_re = self._BLOOM_VERB_RE.get(bloom_level)
+        has_bloom_verb = bloom_re is not None and bool(bloom_re.search(co_lower))
         vtu_checks = {
-            'proper_format': bool(re.match(r'^CO[1-6]\s+[A-Z]', co_text)),
-            'has_action_verb': any(
-                verb in co_text.lower() 
-                for verbs in self.vtu_action_verbs.values() 
-                for verb in verbs
-            ),
-            'correct_bloom_verb': any(
-                verb in co_text.lower() 
-                for verb in self.vtu_action_verbs.get(bloom_level, [])
-            ),
-            'specific_content': any(
-                term in co_text.lower() 
-                for term in ['sql', 'database', 'normalization', 'transaction', 
-                           'query', 'schema', 'mongodb', 'index']
-            )
+            'proper_format': bool(_CO_FORMAT_RE.match(co_text)),
+            'has_action_verb': bool(self._ACTION_VERB_RE.search(co_lower)),
+            'correct_bloom_verb': has_bloom_verb,
+            'specific_content': any(term in co_lower for term in self.SPECIFIC_TERMS)
         }
         scores['vtu_compliance'] = sum(vtu_checks.values()) / len(vtu_checks)
         
         # 3. OBE alignment score
-        measurable_verbs = ['apply', 'analyse', 'analyze', 'evaluate', 'create', 
-                          'design', 'implement', 'demonstrate', 'conduct']
         has_po = 'PO' in po_mappings
-        has_measurable = any(v in co_text.lower() for v in measurable_verbs)
+        has_measurable = bool(self._MEASURABLE_VERB_RE.search(co_lower))
         scores['obe_alignment'] = (0.5 if has_po else 0) + (0.5 if has_measurable else 0)
         
         # 4. Bloom accuracy (presence of correct level verbs)
-        bloom_verbs = self.vtu_action_verbs.get(bloom_level, [])
-        scores['bloom_accuracy'] = 1.0 if any(v in co_text.lower() for v in bloom_verbs) else 0.5
+        scores['bloom_accuracy'] = 1.0 if has_bloom_verb else 0.5
         
         # 5. Specificity score (technical terms)
-        technical_terms = ['sql', 'relational', 'normalization', 'transaction',
-                          'acid', 'mongodb', 'nosql', 'indexing', 'query',
-                          'schema', 'erd', 'constraint', 'trigger']
-        term_count = sum(1 for t in technical_terms if t in co_text.lower())
+        term_count = sum(1 for t in self.TECHNICAL_TERMS if t in co_lower)
         scores['specificity'] = min(1.0, term_count / 3)
         
         # Calculate weighted reward score
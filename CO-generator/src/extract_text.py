@@ -1,17 +1,30 @@
 import os
 from pathlib import Path
 from pdfminer.high_level import extract_text
+from PyPDF2 import PdfReader
 from pptx import Presentation
 from pdf2image import convert_from_path
 import pytesseract
 
 RAW_DIR = "data/raw"
 OUT_DIR = "data/extracted"
+MIN_PAGE_CHARS = 20  # PyPDF2 pages shorter than this get pdfminer layout analysis
 
 os.makedirs(OUT_DIR, exist_ok=True)
 
 def extract_pdf(path):
-    text = extract_text(path)
+    # PyPDF2 reads the content stream directly; pdfminer's layout analysis is
+    # much slower, so it only runs on pages PyPDF2 got (almost) nothing from
+    pages = [page.extract_text() or "" for page in PdfReader(path).pages]
+    weak = [i for i, page_text in enumerate(pages) if len(page_text.strip()) < MIN_PAGE_CHARS]
+    if weak:
+        # One pdfminer pass over all weak pages; it ends each page with a form feed
+        layout_pages = extract_text(path, page_numbers=weak).split("\f")
+        if len(layout_pages) >= len(weak):
+            for i, page_text in zip(weak, layout_pages):
+                if len(page_text.strip()) > len(pages[i].strip()):
+                    pages[i] = page_text
+    text = "\n".join(pages)
     if text.strip():
         return text
     
@@ -25,15 +38,15 @@ def extract_pdf(path):
 
 def extract_ppt(path):
     prs = Presentation(path)
-    total = []
-    for slide in prs.slides:
-        temp = []
-        for shape in slide.shapes:
-            if hasattr(shape, "text"):
-                temp.append(shape.text)
-        slide_text = "\n".join(temp)
-        total.append(slide_text)
-    return "\n\n".join(total)
+    # Slides separated by a blank line, shapes by a newline; one join per level
+    return "\n\n".join(
+        "\n".join(
+            shape.text_frame.text
+            for shape in slide.shapes
+            if getattr(shape, "has_text_frame", False)
+        )
+        for slide in prs.slides
+    )
 
 
 def extract_all():
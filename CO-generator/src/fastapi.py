@@ -532,17 +532,23 @@ Complete implementation matching Streamlit dashboard features:
 """
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form, BackgroundTasks
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import tempfile
 import os
 import sys
+import asyncio
+import threading
+import aiofiles
 from pathlib import Path
 from datetime import datetime
 import json
 import io
+import hashlib
+from collections import OrderedDict
+from operator import attrgetter
 
 # Add src to path
 sys.path.insert(0, os.path.dirname(__file__))
@@ -566,8 +572,16 @@ try:
 except ImportError:
     DOCX_AVAILABLE = False
 
+# Optional: faster JSON encoding for the streaming endpoint (pip install orjson)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from smart_co_generator import VTUCOGenerator, evaluate_generated_cos
 from metrics_evaluation import MetricsEvaluator, BLOOM_TAXONOMY, VTU_PO_DESCRIPTIONS
+from embedder import get_embedder
 
 # Import latency optimization
 try:
@@ -579,7 +593,10 @@ except ImportError:
 
 # Import ChromaDB utils
 try:
-    from chromadb_utils import search_syllabus, get_relevant_content_for_co, get_major_topics_from_syllabus
+    from chromadb_utils import (
+        search_syllabus, get_relevant_content_for_co, get_major_topics_from_syllabus,
+        get_document_count, get_collection, QUERY_CACHE, RAM_INDEX
+    )
     CHROMADB_AVAILABLE = True
 except ImportError:
     CHROMADB_AVAILABLE = False
@@ -598,12 +615,22 @@ app = FastAPI(
 )
 
 # Add CORS middleware
+# Browser origins allowed to call this API (comma-separated CORS_ORIGINS).
+# An explicit list keeps credentialed CORS valid and max_age lets browsers
+# cache preflights instead of sending an OPTIONS before every upload
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:5173,http://frontend:5173").split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=600,
 )
 
 # Initialize components
@@ -625,6 +652,37 @@ if LATENCY_OPTIMIZER_AVAILABLE:
 else:
     profiler = None
 
+# Response cache for /generate-cos: re-uploads of the same material with the
+# same Apply/Analyze split reuse the previous COs. Keyed on the exact text
+# hash, since the generated COs depend on details (e.g. the lab tools named)
+# that a similarity match would not distinguish. Only touched from the event loop
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_TTL = 3600  # seconds
+RESPONSE_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (timestamp, response)
+RESPONSE_CACHE_STATS = {'hits': 0, 'misses': 0}
+
+
+def prewarm_models():
+    """Run the one-time model and ChromaDB setup before the first request"""
+    import time
+    start = time.time()
+    # First forward pass initializes kernels (and the CUDA context on GPU)
+    get_embedder().encode(["warmup"], show_progress_bar=False)
+    if CHROMADB_AVAILABLE:
+        collection = get_collection()
+        if collection is not None:
+            RAM_INDEX.load(collection)
+    print(f"🔥 Models pre-warmed in {(time.time() - start) * 1000:.0f} ms")
+
+
+@app.on_event("startup")
+async def prewarm_on_startup():
+    """Shift cold-start cost out of the first user request"""
+    try:
+        await asyncio.to_thread(prewarm_models)
+    except Exception as e:
+        print(f"⚠️ Pre-warm failed: {e}")
+
 # ============================================================================
 # PYDANTIC MODELS
 # ============================================================================
@@ -734,7 +792,12 @@ def extract_pdf(file_path: str) -> str:
         return ""
     try:
         reader = PdfReader(file_path)
-        return "\n".join([page.extract_text() or "" for page in reader.pages])
+        buffer = io.StringIO()
+        for page_num, page in enumerate(reader.pages):
+            if page_num:
+                buffer.write("\n")
+            buffer.write(page.extract_text() or "")
+        return buffer.getvalue()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading PDF: {e}")
 
@@ -744,12 +807,13 @@ def extract_pptx(file_path: str) -> str:
         return ""
     try:
         prs = Presentation(file_path)
-        text = ""
+        buffer = io.StringIO()
         for slide in prs.slides:
             for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    text += shape.text + "\n"
-        return text
+                if getattr(shape, "has_text_frame", False):
+                    buffer.write(shape.text_frame.text)
+                    buffer.write("\n")
+        return buffer.getvalue()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading PPTX: {e}")
 
@@ -759,29 +823,114 @@ def extract_docx(file_path: str) -> str:
         return ""
     try:
         doc = docx.Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
+        return "\n".join(map(attrgetter('text'), doc.paragraphs))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading DOCX: {e}")
 
+def extract_txt(file_path: str) -> str:
+    """Extract text from TXT"""
+    # Read raw bytes and decode once; skips TextIOWrapper's incremental decoding
+    with open(file_path, 'rb') as f:
+        return f.read().decode('utf-8', errors='ignore')
+
+# Extractor lookup by file suffix
+EXTRACTORS = {
+    '.pdf': extract_pdf,
+    '.ppt': extract_pptx,
+    '.pptx': extract_pptx,
+    '.doc': extract_docx,
+    '.docx': extract_docx,
+    '.txt': extract_txt,
+}
+
 def extract_text_from_file(file_path: str, filename: str) -> str:
     """Extract text from uploaded file"""
-    suffix = Path(filename).suffix.lower()
+    extractor = EXTRACTORS.get(os.path.splitext(filename)[1].lower())
+    if extractor is None:
+        return ""
 
     try:
-        if suffix == '.pdf':
-            return extract_pdf(file_path)
-        elif suffix in ['.ppt', '.pptx']:
-            return extract_pptx(file_path)
-        elif suffix in ['.doc', '.docx']:
-            return extract_docx(file_path)
-        elif suffix == '.txt':
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-        else:
-            return ""
+        return extractor(file_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error extracting text from {filename}: {e}")
 
+UPLOAD_CHUNK_SIZE = 1 << 20  # Stream uploads to disk 1 MB at a time
+EXTRACT_CONCURRENCY = 4  # Files uploaded/parsed at once across all requests
+EXTRACT_SEMAPHORE = asyncio.Semaphore(EXTRACT_CONCURRENCY)
+
+# Extracted text keyed by a hash of the file bytes, so re-uploading the same
+# document skips parsing (in-process LRU backed by a disk cache)
+EXTRACT_CACHE_DIR = Path("data/extract_cache")
+EXTRACT_CACHE_SIZE = 128
+EXTRACT_CACHE_MAX_FILES = 512  # Disk entries kept; least recently used evicted first
+_extract_cache: "OrderedDict[str, str]" = OrderedDict()
+_extract_cache_lock = threading.Lock()  # extraction runs in worker threads
+
+def extractor_available(suffix: str) -> bool:
+    """Whether the optional parser for this suffix is installed"""
+    if suffix == '.pdf':
+        return PDF_AVAILABLE
+    if suffix in ('.ppt', '.pptx'):
+        return PPTX_AVAILABLE
+    if suffix in ('.doc', '.docx'):
+        return DOCX_AVAILABLE
+    return suffix in EXTRACTORS
+
+def prune_extract_cache():
+    """Evict the oldest disk cache entries (by mtime) beyond EXTRACT_CACHE_MAX_FILES"""
+    try:
+        entries = sorted(EXTRACT_CACHE_DIR.glob("*.txt"), key=lambda p: p.stat().st_mtime)
+        for stale in entries[:max(0, len(entries) - EXTRACT_CACHE_MAX_FILES)]:
+            stale.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"⚠️ Could not prune extract cache: {e}")
+
+def extract_text_cached(content_hash: str, file_path: str, filename: str) -> str:
+    """Extract text from an uploaded file, reusing results for identical content"""
+    suffix = os.path.splitext(filename)[1].lower()
+    key = f"{content_hash}{suffix}"
+
+    with _extract_cache_lock:
+        if key in _extract_cache:
+            _extract_cache.move_to_end(key)
+            return _extract_cache[key]
+
+    cache_file = EXTRACT_CACHE_DIR / f"{key}.txt"
+    if cache_file.exists():
+        text = cache_file.read_text(encoding="utf-8")
+        try:
+            os.utime(cache_file)  # mark as recently used for eviction
+        except OSError:
+            pass
+    else:
+        text = extract_text_from_file(file_path, filename)
+        # A missing parser yields "", which must not outlive this process:
+        # the file should parse once the dependency is installed
+        if extractor_available(suffix):
+            try:
+                EXTRACT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                # Concurrent requests for the same hash may read this entry:
+                # write a temp file (not *.txt, so pruning skips it) and swap
+                # it in so they never see a partial file
+                fd, tmp_path = tempfile.mkstemp(dir=EXTRACT_CACHE_DIR, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        f.write(text)
+                    os.replace(tmp_path, cache_file)
+                except OSError:
+                    os.remove(tmp_path)
+                    raise
+            except OSError as e:
+                print(f"⚠️ Could not write extract cache: {e}")
+            else:
+                prune_extract_cache()
+
+    with _extract_cache_lock:
+        _extract_cache[key] = text
+        if len(_extract_cache) > EXTRACT_CACHE_SIZE:
+            _extract_cache.popitem(last=False)
+    return text
+
 # ============================================================================
 # CO REGENERATION LOGIC
 # ============================================================================
@@ -862,6 +1011,156 @@ def regenerate_co_with_feedback(co_num: int, original_text: str, bloom_level: st
 # HELPER FUNCTIONS
 # ============================================================================
 
+def response_cache_key(all_text: str, num_apply: int, num_analyze: int) -> tuple:
+    """Exact key for the /generate-cos response cache"""
+    return (hashlib.sha256(all_text.encode('utf-8')).hexdigest(), num_apply, num_analyze)
+
+def response_cache_get(key: tuple):
+    """Cached (cos, pipeline_metrics) for key, or None on miss/expiry"""
+    import time
+    entry = RESPONSE_CACHE.get(key)
+    if entry is not None and time.time() - entry[0] < RESPONSE_CACHE_TTL:
+        RESPONSE_CACHE.move_to_end(key)
+        RESPONSE_CACHE_STATS['hits'] += 1
+        return entry[1]
+    if entry is not None:
+        del RESPONSE_CACHE[key]
+    RESPONSE_CACHE_STATS['misses'] += 1
+    return None
+
+def response_cache_set(key: tuple, response):
+    """Store a response, evicting the least recently used entry"""
+    import time
+    RESPONSE_CACHE[key] = (time.time(), response)
+    RESPONSE_CACHE.move_to_end(key)
+    if len(RESPONSE_CACHE) > RESPONSE_CACHE_SIZE:
+        RESPONSE_CACHE.popitem(last=False)
+
+def response_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for health reporting"""
+    total = RESPONSE_CACHE_STATS['hits'] + RESPONSE_CACHE_STATS['misses']
+    return {
+        'size': len(RESPONSE_CACHE),
+        'max_size': RESPONSE_CACHE_SIZE,
+        'ttl_seconds': RESPONSE_CACHE_TTL,
+        **RESPONSE_CACHE_STATS,
+        'hit_rate': f"{RESPONSE_CACHE_STATS['hits'] / total:.1%}" if total else "0.0%"
+    }
+
+def _json_default(obj):
+    """orjson fallback for numpy scalars and other non-native values"""
+    if hasattr(obj, 'item'):
+        return obj.item()
+    raise TypeError
+
+def ndjson_line(obj: Dict[str, Any]) -> bytes:
+    """Encode one newline-delimited JSON record for a streaming response"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj,
+            default=_json_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+        )
+    return (json.dumps(obj) + "\n").encode()
+
+def score_co(co_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Score one generated CO and shape it for the API response"""
+    po_list = [po.strip() for po in co_data['po_mappings'].split(',')]
+    metrics = evaluator.evaluate_single_co(
+        co_data['co_text'],
+        co_data['bloom_level'],
+        po_list
+    )
+    return {
+        'co_num': co_data['co_num'],
+        'co_text': co_data['co_text'],
+        'bloom_level': co_data['bloom_level'],
+        'po_mappings': co_data['po_mappings'],
+        'topics_covered': co_data.get('topics_covered', []),
+        'reward_score': metrics.overall_quality_score,
+        'individual_scores': {
+            'vtu': metrics.vtu_compliance_score,
+            'obe': metrics.obe_alignment_score,
+            'bloom': metrics.bloom_accuracy,
+            'conciseness': metrics.conciseness_score
+        },
+        'approved': metrics.overall_quality_score >= 0.70,
+        'word_count': metrics.word_count,
+        'has_action_verb': metrics.has_action_verb,
+        'has_specific_concepts': metrics.has_specific_concepts
+    }
+
+def stream_scored_cos(generated_cos: List[Dict[str, Any]]):
+    """Yield each CO as soon as it is scored (the batched path collects these)"""
+    for co_data in generated_cos:
+        yield score_co(co_data)
+
+def generate_and_evaluate(all_text: str, num_apply: int, num_analyze: int):
+    """Generate COs from extracted text and score them (the uncached path)"""
+    import time
+    # Generate COs
+    gen_start = time.time()
+    generated_cos = generator.generate_custom_cos(
+        all_text,
+        num_apply=num_apply,
+        num_analyze=num_analyze
+    )
+    llm_inference_ms = (time.time() - gen_start) * 1000
+
+    # Evaluate each CO
+    eval_start = time.time()
+    cos_with_metrics = list(stream_scored_cos(generated_cos))
+    refinement_ms = (time.time() - eval_start) * 1000
+
+    # Compute aggregate metrics
+    pipeline_metrics_obj = evaluator.evaluate_all_cos([
+        {'co_text': co['co_text'], 'bloom_level': co['bloom_level'], 'po_mappings': co['po_mappings']}
+        for co in cos_with_metrics
+    ])
+
+    return cos_with_metrics, pipeline_metrics_obj, llm_inference_ms, refinement_ms
+
+async def generate_cos_cached(all_text: str, num_apply: int, num_analyze: int):
+    """
+    Serve from the response cache when the same text was uploaded recently,
+    otherwise generate and cache.
+    Returns (cos, pipeline_metrics, llm_ms, refinement_ms)
+    """
+    cache_key = response_cache_key(all_text, num_apply, num_analyze)
+    cached = response_cache_get(cache_key)
+    if cached is not None:
+        print("⚡ Response cache hit for /generate-cos")
+        return [dict(co) for co in cached[0]], cached[1], 0.0, 0.0
+
+    # Generation + scoring encode text on the CPU; keep them off the event loop
+    cos, pipeline_metrics_obj, llm_inference_ms, refinement_ms = \
+        await asyncio.to_thread(generate_and_evaluate, all_text, num_apply, num_analyze)
+    response_cache_set(cache_key, ([dict(co) for co in cos], pipeline_metrics_obj))
+    return cos, pipeline_metrics_obj, llm_inference_ms, refinement_ms
+
+# In-flight generations by request key; duplicates await the same task
+INFLIGHT_GENERATIONS: Dict[tuple, asyncio.Task] = {}
+
+async def coalesce_inflight(key: tuple, work):
+    """Run work() once per key at a time; concurrent callers share its result"""
+    task = INFLIGHT_GENERATIONS.get(key)
+    if task is not None:
+        print("⚡ Joining in-flight /generate-cos request")
+    else:
+        # work() runs as its own task, so a disconnecting first caller
+        # cancels only its own wait, not the generation others joined
+        task = asyncio.create_task(work())
+        INFLIGHT_GENERATIONS[key] = task
+
+        def finished(t: asyncio.Task):
+            if INFLIGHT_GENERATIONS.get(key) is t:
+                del INFLIGHT_GENERATIONS[key]
+            # Mark the exception retrieved so an unawaited failure doesn't warn
+            t.cancelled() or t.exception()
+
+        task.add_done_callback(finished)
+    return await asyncio.shield(task)
+
 def calculate_ml_metrics(start_time: float, num_cos: int, profiler_stats: Dict = None) -> MLMetrics:
     """Calculate ML-specific metrics"""
     import time
@@ -887,6 +1186,32 @@ def calculate_ml_metrics(start_time: float, num_cos: int, profiler_stats: Dict =
         vector_search_ms=round(vector_search_ms, 2)
     )
 
+def build_pipeline_metrics(pipeline_metrics_obj, doc_processing_ms: float, llm_inference_ms: float,
+                           refinement_ms: float, start_time: float, num_cos: int,
+                           profiler_stats: Dict = None) -> PipelineMetrics:
+    """Combine evaluator scores and stage timings into the PipelineMetrics response model"""
+    import time
+    ml_metrics = calculate_ml_metrics(start_time, num_cos, profiler_stats)
+    total_pipeline_ms = (time.time() - start_time) * 1000
+
+    return PipelineMetrics(
+        bloom_classification_accuracy=pipeline_metrics_obj.bloom_classification_accuracy,
+        average_quality_score=pipeline_metrics_obj.average_quality_score,
+        average_vtu_compliance=pipeline_metrics_obj.average_vtu_compliance,
+        average_obe_alignment=pipeline_metrics_obj.average_obe_alignment,
+        average_conciseness_score=pipeline_metrics_obj.average_conciseness_score,
+        po_coverage=pipeline_metrics_obj.po_coverage,
+        document_processing_ms=round(doc_processing_ms, 2),
+        embedding_generation_ms=0.0,
+        graph_construction_ms=0.0,
+        vector_search_ms=0.0,
+        graph_traversal_ms=0.0,
+        llm_inference_ms=round(llm_inference_ms, 2),
+        refinement_ms=round(refinement_ms, 2),
+        total_pipeline_ms=round(total_pipeline_ms, 2),
+        ml_metrics=ml_metrics
+    )
+
 def store_generation_metrics(session_id: str, cos: List[Dict], metrics: Dict):
     """Store generation metrics for later retrieval"""
     METRICS_STORE['generation_history'].append({
@@ -952,33 +1277,110 @@ async def root():
         "system_metrics": system_metrics
     }
 
-@app.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Health check endpoint with system metrics"""
+HEALTH_TTL_SECONDS = 5.0  # Probe bursts inside this window share one real check
+_health_cache: Dict[str, Any] = {"ts": 0.0, "payload": None}
+_health_lock = asyncio.Lock()
+
+def sample_system_metrics() -> Dict[str, Any]:
+    """Sample host metrics (blocks ~100 ms for the CPU reading)"""
     try:
         import psutil
-        system_metrics = {
+        memory = psutil.virtual_memory()  # One probe for both memory fields
+        return {
             'cpu_percent': psutil.cpu_percent(interval=0.1),
-            'memory_percent': psutil.virtual_memory().percent,
-            'memory_available_mb': psutil.virtual_memory().available / (1024 * 1024),
+            'memory_percent': memory.percent,
+            'memory_available_mb': memory.available / (1024 * 1024),
             'disk_percent': psutil.disk_usage('/').percent,
             'total_generations': METRICS_STORE['aggregate_metrics'].get('total_generations', 0)
         }
     except:
-        system_metrics = {}
+        return {}
 
-    return {
-        "status": "healthy",
-        "version": "2.0.0",
-        "dependencies": {
-            "pdf_available": PDF_AVAILABLE,
-            "pptx_available": PPTX_AVAILABLE,
-            "docx_available": DOCX_AVAILABLE,
-            "chromadb_available": CHROMADB_AVAILABLE,
-            "latency_optimizer_available": LATENCY_OPTIMIZER_AVAILABLE
-        },
-        "system_metrics": system_metrics
-    }
+@app.get("/health", response_model=HealthResponse)
+async def health_check(force: bool = False):
+    """
+    Health check endpoint with system metrics.
+    Results are reused for HEALTH_TTL_SECONDS; pass ?force=true to bypass.
+    """
+    import time
+    if not force and _health_cache["payload"] is not None \
+            and time.monotonic() - _health_cache["ts"] < HEALTH_TTL_SECONDS:
+        return _health_cache["payload"]
+
+    async with _health_lock:
+        # A concurrent probe may have refreshed it while we waited
+        if not force and _health_cache["payload"] is not None \
+                and time.monotonic() - _health_cache["ts"] < HEALTH_TTL_SECONDS:
+            return _health_cache["payload"]
+
+        system_metrics = await asyncio.to_thread(sample_system_metrics)
+
+        if CHROMADB_AVAILABLE:
+            system_metrics['query_cache'] = QUERY_CACHE.get_stats()
+            try:
+                system_metrics['chromadb_documents'] = await asyncio.to_thread(get_document_count)
+            except Exception:
+                system_metrics['chromadb_documents'] = None
+        system_metrics['response_cache'] = response_cache_stats()
+
+        payload = {
+            "status": "healthy",
+            "version": "2.0.0",
+            "dependencies": {
+                "pdf_available": PDF_AVAILABLE,
+                "pptx_available": PPTX_AVAILABLE,
+                "docx_available": DOCX_AVAILABLE,
+                "chromadb_available": CHROMADB_AVAILABLE,
+                "latency_optimizer_available": LATENCY_OPTIMIZER_AVAILABLE
+            },
+            "system_metrics": system_metrics
+        }
+        _health_cache["ts"] = time.monotonic()
+        _health_cache["payload"] = payload
+        return payload
+
+async def extract_uploads(files: List[UploadFile], temp_files: List[str]):
+    """
+    Stream every upload to a temp file and extract its text, concurrently.
+    Temp paths are appended to temp_files so the caller can clean them up.
+    Returns (file_hashes, all_text) in upload order.
+    """
+    async def process_file(uploaded_file: UploadFile):
+        suffix = Path(uploaded_file.filename).suffix.lower()
+        fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        temp_files.append(tmp_path)
+
+        # Stream to disk in chunks (memory stays O(chunk)), hashing as we go.
+        # Not under the semaphore: a slow client must not hold a parse slot
+        hasher = hashlib.blake2b(digest_size=16)
+        async with aiofiles.open(tmp_path, 'wb') as tmp:
+            while chunk := await uploaded_file.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+                await tmp.write(chunk)
+
+        # Parsing is CPU-bound; run it in a worker thread
+        content_hash = hasher.hexdigest()
+        async with EXTRACT_SEMAPHORE:
+            text = await asyncio.to_thread(
+                extract_text_cached, content_hash, tmp_path, uploaded_file.filename
+            )
+        return content_hash, text
+
+    # Files are independent: upload + parse them concurrently (order kept)
+    tasks = [asyncio.create_task(process_file(f)) for f in files]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # Stop the remaining files before the caller unlinks their temp
+        # paths, or they'd keep writing (and recreate) files nobody cleans up
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    file_hashes = [content_hash for content_hash, _ in results]
+    all_text = "".join(text + "\n\n" for _, text in results)
+    return file_hashes, all_text
 
 @app.post("/generate-cos", response_model=COGenerationResponse)
 async def generate_cos(
@@ -1012,20 +1414,12 @@ async def generate_cos(
     # Extract text from all files
     all_text = ""
     temp_files = []
+    file_hashes = []
 
     try:
         # Document processing
         doc_start = time.time()
-        for uploaded_file in files:
-            suffix = Path(uploaded_file.filename).suffix.lower()
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                content = await uploaded_file.read()
-                tmp.write(content)
-                tmp_path = tmp.name
-                temp_files.append(tmp_path)
-
-            text = extract_text_from_file(tmp_path, uploaded_file.filename)
-            all_text += text + "\n\n"
+        file_hashes, all_text = await extract_uploads(files, temp_files)
         doc_processing_ms = (time.time() - doc_start) * 1000
 
         if not all_text.strip():
@@ -1034,81 +1428,17 @@ async def generate_cos(
                 detail="No text could be extracted from the uploaded files"
             )
 
-        # Generate COs
-        gen_start = time.time()
-        generated_cos = generator.generate_custom_cos(
-            all_text,
-            num_apply=num_apply,
-            num_analyze=num_analyze
+        # Identical uploads arriving together share one generation
+        request_key = (tuple(file_hashes), num_apply, num_analyze)
+        cos, pipeline_metrics_obj, llm_inference_ms, refinement_ms = await coalesce_inflight(
+            request_key, lambda: generate_cos_cached(all_text, num_apply, num_analyze)
         )
-        llm_inference_ms = (time.time() - gen_start) * 1000
-
-        # Evaluate each CO
-        eval_start = time.time()
-        cos_with_metrics = []
-        bloom_distribution = {}
-
-        for co_data in generated_cos:
-            po_list = [po.strip() for po in co_data['po_mappings'].split(',')]
-            metrics = evaluator.evaluate_single_co(
-                co_data['co_text'],
-                co_data['bloom_level'],
-                po_list
-            )
+        cos_with_metrics = [dict(co) for co in cos]
 
-            # Track Bloom distribution
-            bloom_level = co_data['bloom_level']
-            bloom_distribution[bloom_level] = bloom_distribution.get(bloom_level, 0) + 1
-
-            cos_with_metrics.append({
-                'co_num': co_data['co_num'],
-                'co_text': co_data['co_text'],
-                'bloom_level': bloom_level,
-                'po_mappings': co_data['po_mappings'],
-                'topics_covered': co_data.get('topics_covered', []),
-                'reward_score': metrics.overall_quality_score,
-                'individual_scores': {
-                    'vtu': metrics.vtu_compliance_score,
-                    'obe': metrics.obe_alignment_score,
-                    'bloom': metrics.bloom_accuracy,
-                    'conciseness': metrics.conciseness_score
-                },
-                'approved': metrics.overall_quality_score >= 0.70,
-                'word_count': metrics.word_count,
-                'has_action_verb': metrics.has_action_verb,
-                'has_specific_concepts': metrics.has_specific_concepts
-            })
-        refinement_ms = (time.time() - eval_start) * 1000
-
-        # Compute aggregate metrics
-        pipeline_metrics_obj = evaluator.evaluate_all_cos([
-            {'co_text': co['co_text'], 'bloom_level': co['bloom_level'], 'po_mappings': co['po_mappings']}
-            for co in cos_with_metrics
-        ])
-
-        # Calculate ML metrics
-        ml_metrics = calculate_ml_metrics(start_time, len(cos_with_metrics),
-                                          profiler.get_stats() if profiler else None)
-
-        # Build comprehensive pipeline metrics
-        total_pipeline_ms = (time.time() - start_time) * 1000
-
-        pipeline_metrics = PipelineMetrics(
-            bloom_classification_accuracy=pipeline_metrics_obj.bloom_classification_accuracy,
-            average_quality_score=pipeline_metrics_obj.average_quality_score,
-            average_vtu_compliance=pipeline_metrics_obj.average_vtu_compliance,
-            average_obe_alignment=pipeline_metrics_obj.average_obe_alignment,
-            average_conciseness_score=pipeline_metrics_obj.average_conciseness_score,
-            po_coverage=pipeline_metrics_obj.po_coverage,
-            document_processing_ms=round(doc_processing_ms, 2),
-            embedding_generation_ms=0.0,
-            graph_construction_ms=0.0,
-            vector_search_ms=0.0,
-            graph_traversal_ms=0.0,
-            llm_inference_ms=round(llm_inference_ms, 2),
-            refinement_ms=round(refinement_ms, 2),
-            total_pipeline_ms=round(total_pipeline_ms, 2),
-            ml_metrics=ml_metrics
+        # Build comprehensive pipeline metrics (incl. ML metrics)
+        pipeline_metrics = build_pipeline_metrics(
+            pipeline_metrics_obj, doc_processing_ms, llm_inference_ms, refinement_ms,
+            start_time, len(cos_with_metrics), profiler.get_stats() if profiler else None
         )
 
         # Store metrics in background
@@ -1146,6 +1476,116 @@ async def generate_cos(
             except:
                 pass
 
+@app.post("/generate-cos/stream")
+async def generate_cos_stream(
+    files: List[UploadFile] = File(..., description="Course material files (PDF, PPTX, DOCX, TXT)"),
+    num_apply: int = Form(2, ge=0, le=4, description="Number of Apply-level COs"),
+    num_analyze: int = Form(2, ge=0, le=4, description="Number of Analyze-level COs")
+):
+    """
+    Same as /generate-cos, but streams newline-delimited JSON: one line per
+    CO as soon as it is scored, then a final line with the pipeline metrics.
+    Shares the /generate-cos response cache and records the run in
+    METRICS_STORE; it does not join in-flight /generate-cos requests.
+
+    time_to_first_scored_co_ms in the final line is measured from the
+    request start to the first CO line. The generator produces all COs in
+    one call, so this includes the full LLM step; only scoring is streamed.
+    """
+    import time
+    start_time = time.time()
+    session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    if num_apply + num_analyze != 4:
+        raise HTTPException(
+            status_code=400,
+            detail=f"num_apply + num_analyze must equal 4. Got {num_apply} + {num_analyze} = {num_apply + num_analyze}"
+        )
+
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+
+    temp_files = []
+    try:
+        doc_start = time.time()
+        _, all_text = await extract_uploads(files, temp_files)
+        doc_processing_ms = (time.time() - doc_start) * 1000
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing files: {str(e)}")
+    finally:
+        # Text is already extracted; the stream doesn't need the temp files
+        for tmp_path in temp_files:
+            try:
+                os.unlink(tmp_path)
+            except:
+                pass
+
+    if not all_text.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="No text could be extracted from the uploaded files"
+        )
+
+    async def co_lines():
+        first_co_ms = None
+        cache_key = response_cache_key(all_text, num_apply, num_analyze)
+        cached = response_cache_get(cache_key)
+        if cached is not None:
+            print("⚡ Response cache hit for /generate-cos/stream")
+            cos_with_metrics = [dict(co) for co in cached[0]]
+            pipeline_metrics_obj = cached[1]
+            llm_inference_ms = refinement_ms = 0.0
+            for co in cos_with_metrics:
+                if first_co_ms is None:
+                    first_co_ms = (time.time() - start_time) * 1000
+                yield ndjson_line({'type': 'co', 'co': co})
+        else:
+            gen_start = time.time()
+            generated_cos = await asyncio.to_thread(
+                generator.generate_custom_cos,
+                all_text,
+                num_apply=num_apply,
+                num_analyze=num_analyze
+            )
+            llm_inference_ms = (time.time() - gen_start) * 1000
+
+            # Time scoring only, not the client reading the stream
+            refinement_ms = 0.0
+            cos_with_metrics = []
+            scored = stream_scored_cos(generated_cos)
+            while True:
+                eval_start = time.time()
+                co = await asyncio.to_thread(next, scored, None)
+                refinement_ms += (time.time() - eval_start) * 1000
+                if co is None:
+                    break
+                if first_co_ms is None:
+                    first_co_ms = (time.time() - start_time) * 1000
+                cos_with_metrics.append(co)
+                yield ndjson_line({'type': 'co', 'co': co})
+
+            pipeline_metrics_obj = await asyncio.to_thread(evaluator.evaluate_all_cos, [
+                {'co_text': co['co_text'], 'bloom_level': co['bloom_level'], 'po_mappings': co['po_mappings']}
+                for co in cos_with_metrics
+            ])
+            response_cache_set(cache_key, ([dict(co) for co in cos_with_metrics], pipeline_metrics_obj))
+
+        pipeline_metrics = build_pipeline_metrics(
+            pipeline_metrics_obj, doc_processing_ms, llm_inference_ms, refinement_ms,
+            start_time, len(cos_with_metrics)
+        )
+        store_generation_metrics(session_id, cos_with_metrics, pipeline_metrics.dict())
+        update_aggregate_metrics(pipeline_metrics_obj.to_dict())
+
+        yield ndjson_line({
+            'type': 'done',
+            'pipeline_metrics': pipeline_metrics_obj.to_dict(),
+            'time_to_first_scored_co_ms': round(first_co_ms or 0.0, 2),
+            'total_pipeline_ms': pipeline_metrics.total_pipeline_ms
+        })
+
+    return StreamingResponse(co_lines(), media_type="application/x-ndjson")
+
 @app.get("/metrics/dashboard", response_model=DashboardMetrics)
 async def get_dashboard_metrics():
     """
@@ -1220,8 +1660,10 @@ async def get_profiler_stats():
 @app.get("/metrics/export")
 async def export_metrics():
     """Export all metrics as JSON"""
-    return StreamingResponse(
-        io.StringIO(json.dumps(METRICS_STORE, indent=2)),
+    # The document is already fully in memory: send it as one body rather
+    # than streaming a StringIO, which writes one chunk per JSON line
+    return Response(
+        content=json.dumps(METRICS_STORE, indent=2),
         media_type="application/json",
         headers={
             "Content-Disposition": f"attachment; filename=co_generator_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
@@ -1266,7 +1708,8 @@ async def regenerate_co(request: RegenerateRequest):
         )
 
         po_list = []
-        metrics = evaluator.evaluate_single_co(
+        metrics = await asyncio.to_thread(
+            evaluator.evaluate_single_co,
             new_co_text,
             request.bloom_level,
             po_list
@@ -1297,7 +1740,7 @@ async def evaluate_co(
     """Evaluate a single CO for quality metrics"""
     try:
         po_list = [po.strip() for po in po_mappings.split(',')] if po_mappings else []
-        metrics = evaluator.evaluate_single_co(co_text, bloom_level, po_list)
+        metrics = await asyncio.to_thread(evaluator.evaluate_single_co, co_text, bloom_level, po_list)
 
         return {
             "success": True,
@@ -1331,7 +1774,7 @@ async def search_chromadb(query: str, n_results: int = 5):
         raise HTTPException(status_code=503, detail="ChromaDB not available")
 
     try:
-        results = search_syllabus(query, n_results)
+        results = await asyncio.to_thread(search_syllabus, query, n_results)
         return {
             "success": True,
             "query": query,
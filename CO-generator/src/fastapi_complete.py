@@ -12,23 +12,29 @@ With proper CO storage, explainability, and metrics.
 """
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form, BackgroundTasks
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import tempfile
 import os
 import sys
+import asyncio
+import threading
+import aiofiles
 from pathlib import Path
 from datetime import datetime
 import json
 import io
+from collections import Counter
+from operator import attrgetter
 
 # Add src to path
 sys.path.insert(0, os.path.dirname(__file__))
 
 # Import complete pipeline
 from complete_pipeline import CompleteCOPipeline, COStorage
+from embedder import get_embedder
 
 # Import document processing utils
 try:
@@ -62,32 +68,101 @@ app = FastAPI(
 )
 
 # Add CORS middleware
+# Browser origins allowed to call this API (comma-separated CORS_ORIGINS).
+# An explicit list keeps credentialed CORS valid and max_age lets browsers
+# cache preflights instead of sending an OPTIONS before every upload
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:5173,http://frontend:5173").split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=600,
 )
 
 # Initialize pipeline (singleton)
 pipeline = None
+pipeline_lock = threading.Lock()
 co_storage = COStorage()
 
 
 def get_pipeline():
     """Get or initialize pipeline"""
     global pipeline
-    if pipeline is None:
-        pipeline = CompleteCOPipeline(
-            neo4j_uri=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
-            neo4j_user=os.getenv("NEO4J_USER", "neo4j"),
-            neo4j_password=os.getenv("NEO4J_PASSWORD", "cogenerator123"),
-            chroma_path=os.getenv("CHROMA_PATH", "data/chroma_db")
-        )
+    with pipeline_lock:
+        if pipeline is None:
+            pipeline = CompleteCOPipeline(
+                neo4j_uri=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+                neo4j_user=os.getenv("NEO4J_USER", "neo4j"),
+                neo4j_password=os.getenv("NEO4J_PASSWORD", "cogenerator123"),
+                chroma_path=os.getenv("CHROMA_PATH", "data/chroma_db")
+            )
     return pipeline
 
 
+# ============================================================================
+# PIPELINE JOB QUEUE
+# ============================================================================
+
+# Each pipeline run holds the extracted text, chunk embeddings and graph in
+# memory, so runs go through a bounded queue instead of piling up under
+# burst uploads. The pipeline object isn't thread-safe, so one worker.
+PIPELINE_QUEUE_SIZE = 32
+PIPELINE_WORKERS = 1
+
+
+async def pipeline_worker(queue: asyncio.Queue):
+    """Run queued pipeline jobs one at a time off the event loop"""
+    while True:
+        kwargs, future = await queue.get()
+        try:
+            if not future.cancelled():
+                result = await asyncio.to_thread(get_pipeline().run_complete_pipeline, **kwargs)
+                if not future.cancelled():
+                    future.set_result(result)
+        except Exception as e:
+            if not future.cancelled():
+                future.set_exception(e)
+        finally:
+            queue.task_done()
+
+
+def prewarm_pipeline():
+    """Build the pipeline and run one encode so the first request doesn't pay for it"""
+    get_pipeline()
+    get_embedder().encode(["warmup"], show_progress_bar=False)
+
+
+@app.on_event("startup")
+async def start_pipeline_workers():
+    """Create the job queue and its workers, then pre-warm the pipeline"""
+    app.state.pipeline_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    app.state.pipeline_workers = [
+        asyncio.create_task(pipeline_worker(app.state.pipeline_queue))
+        for _ in range(PIPELINE_WORKERS)
+    ]
+    try:
+        await asyncio.to_thread(prewarm_pipeline)
+    except Exception as e:
+        print(f"⚠️ Pre-warm failed: {e}")
+
+
+async def run_pipeline_queued(**kwargs) -> Dict:
+    """Enqueue a pipeline run and wait for its result (503 when the queue is full)"""
+    future = asyncio.get_running_loop().create_future()
+    try:
+        app.state.pipeline_queue.put_nowait((kwargs, future))
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Server busy: too many CO generation jobs queued, retry shortly")
+    return await future
+
+
 # ============================================================================
 # PYDANTIC MODELS
 # ============================================================================
@@ -180,7 +255,12 @@ def extract_pdf(file_path: str) -> str:
         return ""
     try:
         reader = PdfReader(file_path)
-        return "\n".join([page.extract_text() or "" for page in reader.pages])
+        buffer = io.StringIO()
+        for page_num, page in enumerate(reader.pages):
+            if page_num:
+                buffer.write("\n")
+            buffer.write(page.extract_text() or "")
+        return buffer.getvalue()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading PDF: {e}")
 
@@ -191,12 +271,12 @@ def extract_pptx(file_path: str) -> str:
         return ""
     try:
         prs = Presentation(file_path)
-        text = ""
-        for slide in prs.slides:
-            for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    text += shape.text + "\n"
-        return text
+        return "".join(
+            shape.text_frame.text + "\n"
+            for slide in prs.slides
+            for shape in slide.shapes
+            if getattr(shape, "has_text_frame", False)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading PPTX: {e}")
 
@@ -207,7 +287,7 @@ def extract_docx(file_path: str) -> str:
         return ""
     try:
         doc = docx.Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
+        return "\n".join(map(attrgetter('text'), doc.paragraphs))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading DOCX: {e}")
 
@@ -224,8 +304,8 @@ def extract_text_from_file(file_path: str, filename: str) -> str:
         elif suffix in ['.doc', '.docx']:
             return extract_docx(file_path)
         elif suffix == '.txt':
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
+            with open(file_path, 'rb') as f:
+                return f.read().decode('utf-8', errors='ignore')
         else:
             return ""
     except Exception as e:
@@ -236,10 +316,13 @@ def extract_text_from_file(file_path: str, filename: str) -> str:
 # API ENDPOINTS
 # ============================================================================
 
-@app.get("/", response_model=HealthResponse)
-async def root():
-    """Root endpoint - health check"""
-    pipe = get_pipeline()
+def health_payload() -> Dict:
+    """
+    Build the health response from the already-built pipeline, if any.
+    Probes must not construct the pipeline (Neo4j connect + model load) or
+    queue behind pipeline_lock, so the global is read once, lock-free.
+    """
+    pipe = pipeline
     return {
         "status": "healthy",
         "version": "2.0.0",
@@ -252,20 +335,16 @@ async def root():
     }
 
 
+@app.get("/", response_model=HealthResponse)
+async def root():
+    """Root endpoint - health check"""
+    return health_payload()
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
-    pipe = get_pipeline()
-    return {
-        "status": "healthy",
-        "version": "2.0.0",
-        "dependencies": {
-            "pdf_available": PDF_AVAILABLE,
-            "pptx_available": PPTX_AVAILABLE,
-            "docx_available": DOCX_AVAILABLE,
-        },
-        "neo4j_connected": pipe.knowledge_graph.connected if pipe else False
-    }
+    return health_payload()
 
 
 @app.post("/generate-cos", response_model=COGenerationResponse)
@@ -296,33 +375,35 @@ async def generate_cos(
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
 
-    # Get pipeline
-    pipe = get_pipeline()
-
     # Save uploaded files temporarily
     temp_files = []
 
     try:
         for uploaded_file in files:
             suffix = Path(uploaded_file.filename).suffix.lower()
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                content = await uploaded_file.read()
-                tmp.write(content)
-                tmp_path = tmp.name
-                temp_files.append(tmp_path)
-
-        # Run complete pipeline
-        result = pipe.run_complete_pipeline(
+            fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+            os.close(fd)
+            temp_files.append(tmp_path)
+
+            # Stream to disk in 1 MB chunks so memory stays O(chunk)
+            async with aiofiles.open(tmp_path, 'wb') as tmp:
+                while chunk := await uploaded_file.read(1 << 20):
+                    await tmp.write(chunk)
+
+        # Run complete pipeline through the bounded job queue
+        result = await run_pipeline_queued(
             file_paths=temp_files,
             num_apply=num_apply,
             num_analyze=num_analyze,
             subject=subject
         )
 
-        # Convert to response format
+        # Convert to response format. model_construct skips pydantic
+        # validation entirely; the rows come straight from the pipeline, so
+        # they are trusted to match CourseOutcome
         cos_response = []
         for co in result['cos']:
-            cos_response.append(CourseOutcome(
+            cos_response.append(CourseOutcome.model_construct(
                 co_num=int(co['co_text'].split()[0][2:]),  # Extract CO number
                 co_text=co['co_text'],
                 bloom_level=co['bloom_level'],
@@ -352,6 +433,8 @@ async def generate_cos(
             timestamp=datetime.now().isoformat()
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"Error in CO generation: {e}")
@@ -397,8 +480,10 @@ async def export_session(session_id: str):
     if not session:
         raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
 
-    return StreamingResponse(
-        io.StringIO(json.dumps(session, indent=2)),
+    # The document is already fully in memory: send it as one body rather
+    # than streaming a StringIO, which writes one chunk per JSON line
+    return Response(
+        content=json.dumps(session, indent=2),
         media_type="application/json",
         headers={
             "Content-Disposition": f"attachment; filename=session_{session_id}.json"
@@ -449,6 +534,18 @@ async def reset_knowledge_graph():
     }
 
 
+def parse_co_mappings(cos: List[Dict]) -> List[Tuple[Dict, int, List[str]]]:
+    """Parse each CO's number and mapped POs once, for all the mapping views"""
+    return [
+        (
+            co,
+            int(co['co_text'].split()[0][2:]),  # Extract CO number
+            [po.strip() for po in co.get('po_mappings', '').split(',') if po.strip()]
+        )
+        for co in cos
+    ]
+
+
 @app.get("/sessions/{session_id}/co-po-mapping")
 async def get_co_po_mapping(session_id: str):
     """
@@ -467,16 +564,9 @@ async def get_co_po_mapping(session_id: str):
 
     mapping_matrix = []
     co_details = []
+    po_coverage = {po: 0 for po in po_list}
 
-    for co in cos:
-        co_num = int(co['co_text'].split()[0][2:])  # Extract CO number
-        co_text = co['co_text']
-        bloom_level = co['bloom_level']
-        po_mappings = co.get('po_mappings', '')
-
-        # Parse PO mappings
-        mapped_pos = [po.strip() for po in po_mappings.split(',') if po.strip()]
-
+    for co, co_num, mapped_pos in parse_co_mappings(cos):
         # Create row for matrix (1 if mapped, 0 if not)
         row = {
             'co_num': co_num,
@@ -487,16 +577,13 @@ async def get_co_po_mapping(session_id: str):
         # Store CO details
         co_details.append({
             'co_num': co_num,
-            'co_text': co_text,
-            'bloom_level': bloom_level,
+            'co_text': co['co_text'],
+            'bloom_level': co['bloom_level'],
             'po_mappings': mapped_pos,
             'score': co.get('scores', {}).get('final_score', 0)
         })
 
-    # Calculate PO coverage statistics
-    po_coverage = {po: 0 for po in po_list}
-    for co in cos:
-        mapped_pos = [po.strip() for po in co.get('po_mappings', '').split(',') if po.strip()]
+        # PO coverage statistics
         for po in mapped_pos:
             if po in po_coverage:
                 po_coverage[po] += 1
@@ -553,6 +640,7 @@ async def visualize_co_po_mapping(session_id: str):
 
     cos = session.get('cos', [])
     po_list = [f"PO{i}" for i in range(1, 13)]
+    parsed_cos = parse_co_mappings(cos)
 
     # Format 1: Heatmap data (for libraries like Chart.js, Plotly)
     heatmap_data = {
@@ -561,27 +649,17 @@ async def visualize_co_po_mapping(session_id: str):
         'z': []  # 2D array: values
     }
 
-    for co in cos:
-        co_num = int(co['co_text'].split()[0][2:])
-        po_mappings = co.get('po_mappings', '')
-        mapped_pos = [po.strip() for po in po_mappings.split(',') if po.strip()]
-
+    for _, _, mapped_pos in parsed_cos:
         row = [1 if po in mapped_pos else 0 for po in po_list]
         heatmap_data['z'].append(row)
 
     # Format 2: Table data (for DataTables, AG Grid)
     table_data = []
-    for co in cos:
-        co_num = int(co['co_text'].split()[0][2:])
-        co_text = co['co_text']
-        bloom_level = co['bloom_level']
-        po_mappings = co.get('po_mappings', '')
-        mapped_pos = [po.strip() for po in po_mappings.split(',') if po.strip()]
-
+    for co, co_num, mapped_pos in parsed_cos:
         row = {
             'co': f"CO{co_num}",
-            'description': co_text,
-            'bloom_level': bloom_level,
+            'description': co['co_text'],
+            'bloom_level': co['bloom_level'],
             'score': round(co.get('scores', {}).get('final_score', 0), 2)
         }
 
@@ -598,8 +676,7 @@ async def visualize_co_po_mapping(session_id: str):
     }
 
     # Add CO nodes
-    for co in cos:
-        co_num = int(co['co_text'].split()[0][2:])
+    for co, co_num, _ in parsed_cos:
         graph_data['nodes'].append({
             'id': f"CO{co_num}",
             'label': f"CO{co_num}",
@@ -617,11 +694,7 @@ async def visualize_co_po_mapping(session_id: str):
         })
 
     # Add edges (CO -> PO mappings)
-    for co in cos:
-        co_num = int(co['co_text'].split()[0][2:])
-        po_mappings = co.get('po_mappings', '')
-        mapped_pos = [po.strip() for po in po_mappings.split(',') if po.strip()]
-
+    for _, co_num, mapped_pos in parsed_cos:
         for po in mapped_pos:
             graph_data['edges'].append({
                 'source': f"CO{co_num}",
@@ -630,33 +703,29 @@ async def visualize_co_po_mapping(session_id: str):
             })
 
     # Format 4: Summary statistics
-    summary = {
-        'total_mappings': sum(
-            len([po.strip() for po in co.get('po_mappings', '').split(',') if po.strip()])
-            for co in cos
-        ),
-        'avg_mappings_per_co': round(
-            sum(len([po.strip() for po in co.get('po_mappings', '').split(',') if po.strip()]) for co in cos) / len(cos), 1
-        ) if len(cos) > 0 else 0,
-        'bloom_distribution': {},
-        'po_utilization': {}
-    }
-
-    # Bloom level distribution
-    for co in cos:
-        bloom = co['bloom_level']
-        summary['bloom_distribution'][bloom] = summary['bloom_distribution'].get(bloom, 0) + 1
+    # One pass over the parsed COs feeds the mapping total, Bloom
+    # distribution and PO usage counters together
+    total_cos = len(cos)
+    total_mappings = 0
+    bloom_counts = Counter()
+    po_counts = Counter()
+    for co, _, mapped_pos in parsed_cos:
+        total_mappings += len(mapped_pos)
+        bloom_counts[co['bloom_level']] += 1
+        po_counts.update(set(mapped_pos))  # A CO counts once per PO
 
-    # PO utilization
-    for po in po_list:
-        count = sum(
-            1 for co in cos
-            if po in [p.strip() for p in co.get('po_mappings', '').split(',')]
-        )
-        summary['po_utilization'][po] = {
-            'count': count,
-            'percentage': round((count / len(cos)) * 100, 1) if len(cos) > 0 else 0
+    summary = {
+        'total_mappings': total_mappings,
+        'avg_mappings_per_co': round(total_mappings / total_cos, 1) if total_cos > 0 else 0,
+        'bloom_distribution': dict(bloom_counts),
+        'po_utilization': {
+            po: {
+                'count': po_counts[po],
+                'percentage': round((po_counts[po] / total_cos) * 100, 1) if total_cos > 0 else 0
+            }
+            for po in po_list
         }
+    }
 
     return {
         "success": True,
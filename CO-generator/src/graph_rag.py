@@ -1,6 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple
-import chromadb
-from sentence_transformers import SentenceTransformer
+from chromadb_utils import EMBEDDING_FUNCTION, QUERY_CACHE, forget_collection, get_client, refresh_if_rebuilt
+from embedder import get_embedder
+
+# Vector search runs here while graph traversal runs on the caller's thread;
+# the two retrievers are independent, so latency is the slower one, not the sum
+_VECTOR_SEARCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="vector-search")
 
 class GraphRAGRetrieval:
     """
@@ -12,12 +17,14 @@ class GraphRAGRetrieval:
     
     def __init__(self, chroma_path: str = "data/chroma_db", collection_name: str = "dbms_syllabus"):
         """Initialize Graph-RAG with vector DB and knowledge graph"""
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedding_model = get_embedder()
         
         # Connect to ChromaDB
         try:
-            self.client = chromadb.PersistentClient(path=chroma_path)
-            self.collection = self.client.get_collection(collection_name)
+            self.client = get_client(chroma_path)
+            self.collection = self.client.get_collection(
+                collection_name, embedding_function=EMBEDDING_FUNCTION
+            )
             self.vector_db_ready = True
             print(" Vector Database (ChromaDB) connected")
         except:
@@ -37,12 +44,24 @@ class GraphRAGRetrieval:
         """Semantic vector search using ChromaDB"""
         if not self.vector_db_ready:
             return []
+        refresh_if_rebuilt()  # drops QUERY_CACHE after an out-of-process rebuild
+        
+        # Level queries are fixed strings, so most lookups repeat across
+        # COs and runs. Entries live in the shared QUERY_CACHE, which is
+        # invalidated whenever this collection's chunks change
+        cache_key = (self.collection.name, 'graph_rag', query, n_results)
+        cached = QUERY_CACHE.get(cache_key)
+        if cached is not None:
+            return [dict(result) for result in cached]  # hybrid_retrieve adds scores in place
         
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results
-            )
+            try:
+                results = self._query(query, n_results)
+            except Exception:
+                # The handle may point at a collection an out-of-process
+                # rebuild deleted: reopen it and retry once
+                self._reopen_collection()
+                results = self._query(query, n_results)
             
             vector_results = []
             if results['documents'] and len(results['documents'][0]) > 0:
@@ -54,11 +73,25 @@ class GraphRAGRetrieval:
                         'source': 'vector_search'
                     })
             
+            QUERY_CACHE.set(cache_key, [dict(result) for result in vector_results])
             return vector_results
         except Exception as e:
             print(f"Vector search error: {e}")
             return []
     
+    def _query(self, query: str, n_results: int):
+        return self.collection.query(
+            query_texts=[query],
+            n_results=n_results
+        )
+    
+    def _reopen_collection(self):
+        """Drop stale handles/caches for this collection and fetch it again"""
+        forget_collection(self.collection.name)
+        self.collection = self.client.get_collection(
+            self.collection.name, embedding_function=EMBEDDING_FUNCTION
+        )
+    
     def graph_search(self, query: str) -> Dict:
         """Knowledge graph traversal for conceptual relationships"""
         if not self.knowledge_graph:
@@ -75,12 +108,11 @@ class GraphRAGRetrieval:
         """
         print(f"Graph-RAG Retrieval for CO{co_num} ({level} level)...")
         
-        # Vector search
-        vector_results = self.vector_search(query, n_results=n_vector)
-        print(f"   Vector search: {len(vector_results)} results")
-        
-        # Graph search
+        # Vector search and graph search, concurrently
+        vector_future = _VECTOR_SEARCH_POOL.submit(self.vector_search, query, n_vector)
         graph_results = self.graph_search(query)
+        vector_results = vector_future.result()
+        print(f"   Vector search: {len(vector_results)} results")
         print(f"    Graph search: {len(graph_results['nodes'])} nodes, {len(graph_results['paths'])} paths")
         
         # Extract graph context
@@ -252,7 +252,13 @@ class ModelOptimizer:
             return "mps"
         return "cpu"
     
-    def optimize_model_for_inference(self, model):
+    def get_torch_dtype(self):
+        """Weight dtype for inference: bf16 on CUDA when supported, else fp16 / fp32"""
+        if self.device == "cuda":
+            return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        return torch.float32  # MPS/CPU work best with float32
+    
+    def optimize_model_for_inference(self, model, compile_model: bool = True):
         """
         Apply inference optimizations to model
         """
@@ -267,7 +273,7 @@ class ModelOptimizer:
             model.config.use_cache = True
         
         # Compile with torch.compile if available (PyTorch 2.0+)
-        if hasattr(torch, 'compile') and self.device != 'mps':
+        if compile_model and hasattr(torch, 'compile') and self.device != 'mps':
             try:
                 model = torch.compile(model, mode='reduce-overhead')
                 print("✅ Model compiled with torch.compile")
@@ -307,10 +313,7 @@ class ModelOptimizer:
         }
         
         if TORCH_AVAILABLE:
-            if self.device == "cuda":
-                config['torch_dtype'] = 'float16'
-            elif self.device == "mps":
-                config['torch_dtype'] = 'float32'  # MPS works best with float32
+            config['torch_dtype'] = str(self.get_torch_dtype()).replace('torch.', '')
         
         return config
     
@@ -379,7 +382,8 @@ class BatchProcessor:
         """
         Batch process embeddings with caching
         """
-        embeddings = []
+        # One slot per input, filled in place so no reordering is needed
+        embeddings = [None] * len(texts)
         texts_to_encode = []
         text_indices = []
         
@@ -388,7 +392,7 @@ class BatchProcessor:
             if cache:
                 cached = cache.get(text)
                 if cached is not None:
-                    embeddings.append((i, cached))
+                    embeddings[i] = cached
                     continue
             texts_to_encode.append(text)
             text_indices.append(i)
@@ -404,15 +408,14 @@ class BatchProcessor:
                 
                 for i, (idx, text) in enumerate(zip(text_indices, texts_to_encode)):
                     emb = new_embeddings[i]
-                    embeddings.append((idx, emb))
+                    embeddings[idx] = emb
                     if cache:
                         cache.set(text, emb)
             except Exception as e:
                 print(f"⚠️ Batch embedding error: {e}")
         
-        # Sort by original index
-        embeddings.sort(key=lambda x: x[0])
-        return [emb for _, emb in embeddings]
+        # Already in input order; skip texts whose encoding failed
+        return [emb for emb in embeddings if emb is not None]
     
     def shutdown(self):
         """Shutdown the executor"""
@@ -465,43 +468,60 @@ class OptimizedPipeline:
     
     @PROFILER.profile("llm_inference")
     def run_llm_inference(self, model, tokenizer, prompts: List[str], 
-                          max_new_tokens: int = 150) -> List[str]:
-        """Optimized LLM inference"""
-        results = []
+                          max_new_tokens: int = 150,
+                          batch_size: int = 8) -> List[str]:
+        """Optimized LLM inference (prompts generated batch_size at a time)"""
+        if not TORCH_AVAILABLE:
+            return ["[Mock output - PyTorch not available]"] * len(prompts)
         
-        for prompt in prompts:
-            if not TORCH_AVAILABLE:
-                results.append("[Mock output - PyTorch not available]")
-                continue
-            
+        results = []
+        for start in range(0, len(prompts), batch_size):
+            batch = prompts[start:start + batch_size]
             try:
-                inputs = tokenizer(
-                    prompt,
-                    return_tensors="pt",
-                    truncation=True,
-                    max_length=1024
-                ).to(self.model_optimizer.device)
-                
-                with torch.no_grad():
-                    outputs = model.generate(
-                        **inputs,
-                        max_new_tokens=max_new_tokens,
-                        temperature=0.8,
-                        do_sample=True,
-                        top_p=0.9,
-                        repetition_penalty=1.5,
-                        pad_token_id=tokenizer.eos_token_id,
-                        use_cache=True  # Enable KV-cache
-                    )
-                
-                decoded = tokenizer.decode(outputs[0], skip_special_tokens=True)
-                results.append(decoded)
-                
-            except Exception as e:
-                results.append(f"[Error: {e}]")
+                results.extend(self._generate_batch(model, tokenizer, batch, max_new_tokens))
+            except Exception:
+                # e.g. out of memory on a wide batch: retry prompt by prompt
+                for prompt in batch:
+                    try:
+                        results.extend(self._generate_batch(model, tokenizer, [prompt], max_new_tokens))
+                    except Exception as e:
+                        results.append(f"[Error: {e}]")
         
         return results
     
+    def _generate_batch(self, model, tokenizer, prompts: List[str],
+                        max_new_tokens: int) -> List[str]:
+        """One padded generate() call for all prompts"""
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        # Decoder-only models continue from the last position, so pad on the left
+        padding_side = tokenizer.padding_side
+        tokenizer.padding_side = "left"
+        try:
+            inputs = tokenizer(
+                prompts,
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=1024
+            ).to(self.model_optimizer.device)
+        finally:
+            tokenizer.padding_side = padding_side
+        
+        with torch.no_grad():
+            outputs = model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                temperature=0.8,
+                do_sample=True,
+                top_p=0.9,
+                repetition_penalty=1.5,
+                pad_token_id=tokenizer.eos_token_id,
+                use_cache=True  # Enable KV-cache
+            )
+        
+        return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    
     def get_optimization_report(self) -> Dict:
         """Get comprehensive optimization report"""
         return {
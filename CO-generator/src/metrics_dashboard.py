@@ -18,6 +18,8 @@ import sys
 import tempfile
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import attrgetter
 
 # Add src to path
 sys.path.insert(0, os.path.dirname(__file__))
@@ -380,43 +382,43 @@ st.markdown("""
 def extract_pdf(file_path):
     """Extract text from PDF"""
     if not PDF_AVAILABLE:
-        return ""
+        return "", None
     try:
         reader = PdfReader(file_path)
-        return "\n".join([page.extract_text() or "" for page in reader.pages])
+        return "\n".join([page.extract_text() or "" for page in reader.pages]), None
     except Exception as e:
-        st.warning(f"Error reading PDF: {e}")
-        return ""
+        return "", f"Error reading PDF: {e}"
 
 def extract_pptx(file_path):
     """Extract text from PPTX"""
     if not PPTX_AVAILABLE:
-        return ""
+        return "", None
     try:
         prs = Presentation(file_path)
-        text = ""
-        for slide in prs.slides:
-            for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    text += shape.text + "\n"
-        return text
+        return "".join(
+            shape.text_frame.text + "\n"
+            for slide in prs.slides
+            for shape in slide.shapes
+            if getattr(shape, "has_text_frame", False)
+        ), None
     except Exception as e:
-        st.warning(f"Error reading PPTX: {e}")
-        return ""
+        return "", f"Error reading PPTX: {e}"
 
 def extract_docx(file_path):
     """Extract text from DOCX"""
     if not DOCX_AVAILABLE:
-        return ""
+        return "", None
     try:
         doc = docx.Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
+        return "\n".join(map(attrgetter('text'), doc.paragraphs)), None
     except Exception as e:
-        st.warning(f"Error reading DOCX: {e}")
-        return ""
+        return "", f"Error reading DOCX: {e}"
+
+# Extractors return (text, error) and never touch st.*: they run in worker
+# threads, which have no ScriptRunContext, so the caller reports errors
 
 def extract_text_from_file(uploaded_file):
-    """Extract text from uploaded file"""
+    """Extract text from uploaded file, returning (text, error message or None)"""
     suffix = Path(uploaded_file.name).suffix.lower()
     
     with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
@@ -431,14 +433,31 @@ def extract_text_from_file(uploaded_file):
         elif suffix in ['.doc', '.docx']:
             return extract_docx(tmp_path)
         elif suffix == '.txt':
-            with open(tmp_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
+            with open(tmp_path, 'rb') as f:
+                return f.read().decode('utf-8', errors='ignore'), None
         else:
-            return ""
+            return "", None
     finally:
         os.unlink(tmp_path)
 
 
+# ============================================================================
+# CO GENERATION SERVICES
+# ============================================================================
+
+@st.cache_resource(show_spinner=False)
+def load_co_services():
+    """
+    Load the CO generator and evaluator once per Streamlit process.
+    Imported lazily so browsing the metrics pages never loads the
+    embedding model.
+    """
+    from smart_co_generator import VTUCOGenerator
+    from metrics_evaluation import MetricsEvaluator
+    
+    return VTUCOGenerator(), MetricsEvaluator()
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -663,15 +682,25 @@ def show_generate_page():
     if generate_clicked and total_co1_4 == 4 and uploaded_files:
         with st.spinner("🔄 Processing documents and generating COs..."):
             try:
-                # Extract text from all files
-                all_text = ""
+                # Extract text from all files in parallel (parsing is independent per file)
                 progress_bar = st.progress(0)
+                texts = [""] * len(uploaded_files)
                 
-                for i, f in enumerate(uploaded_files):
-                    st.text(f"📄 Processing: {f.name}")
-                    text = extract_text_from_file(f)
-                    all_text += text + "\n\n"
-                    progress_bar.progress((i + 1) / len(uploaded_files))
+                with ThreadPoolExecutor(max_workers=min(8, len(uploaded_files))) as executor:
+                    futures = {
+                        executor.submit(extract_text_from_file, f): i
+                        for i, f in enumerate(uploaded_files)
+                    }
+                    for done, future in enumerate(as_completed(futures), 1):
+                        i = futures[future]
+                        texts[i], error = future.result()
+                        if error:
+                            st.warning(error)
+                        st.text(f"📄 Processed: {uploaded_files[i].name}")
+                        progress_bar.progress(done / len(uploaded_files))
+                
+                # Keep upload order in the combined text
+                all_text = "".join(text + "\n\n" for text in texts)
                 
                 if not all_text.strip():
                     st.error("❌ No text could be extracted from the uploaded files.")
@@ -687,11 +716,7 @@ def show_generate_page():
                 # Use Smart CO Generator for reliable VTU-format COs
                 st.text("📝 Using Smart CO Generator...")
                 
-                from smart_co_generator import VTUCOGenerator
-                from metrics_evaluation import MetricsEvaluator
-                
-                generator = VTUCOGenerator()
-                evaluator = MetricsEvaluator()
+                generator, evaluator = load_co_services()
                 
                 # Generate COs based on extracted text
                 st.text("🔍 Analyzing syllabus topics...")
@@ -19,8 +19,7 @@ from collections import defaultdict
 import numpy as np
 
 try:
-    from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
+    from embedder import get_embedder
     EMBEDDINGS_AVAILABLE = True
 except ImportError:
     EMBEDDINGS_AVAILABLE = False
@@ -62,6 +61,74 @@ BLOOM_TAXONOMY = {
     }
 }
 
+# Verb patterns compiled once: one alternation per level instead of a
+# regex/substring scan per verb
+_DETECTION_ORDER = ("Create", "Evaluate", "Analyze", "Apply", "Understand", "Remember")
+_ANYWHERE_ORDER = ("Apply", "Analyze", "Evaluate", "Create", "Understand", "Remember")
+
+
+def _verb_alternation(verbs) -> str:
+    return "|".join(re.escape(verb) for verb in verbs)
+
+
+def _level_alternation(order, after_co=False) -> str:
+    """One named group per level, tried in priority order"""
+    groups = []
+    for level in order:
+        verbs = _verb_alternation(BLOOM_TAXONOMY[level]["verbs"])
+        if after_co:
+            # Whole verb right after the CO number ("ability to" also counts as Evaluate)
+            verbs = rf'(?:{verbs})\b' + (r'|ability\s+to' if level == "Evaluate" else '')
+        groups.append(f'(?P<{level}>{verbs})')
+    return "|".join(groups)
+
+
+# All levels in a single pattern per pass: a scan reports the
+# highest-priority level at each position, so one scan replaces a search
+# per level. The anywhere pattern is a lookahead so overlapping verbs of
+# different levels are all seen
+_VERB_AFTER_CO_RE = re.compile(rf'co[1-6]\s+(?:{_level_alternation(_DETECTION_ORDER, after_co=True)})')
+_VERB_PREFIX_RE = re.compile(_level_alternation(_DETECTION_ORDER))
+_VERB_ANYWHERE_RE = re.compile(f'(?={_level_alternation(_ANYWHERE_ORDER)})')
+
+
+def _best_level_match(matches, order):
+    """Leftmost match of the highest-priority level among matches, or None"""
+    best, best_rank = None, len(order)
+    for match in matches:
+        rank = order.index(match.lastgroup)
+        if rank < best_rank:
+            best, best_rank = match, rank
+            if rank == 0:
+                break
+    return best
+
+
+_ANY_VERB_AFTER_CO_RE = re.compile(
+    rf'co[1-6]\s+(?:{_verb_alternation(v for d in BLOOM_TAXONOMY.values() for v in d["verbs"])})'
+)
+_CO_LEAD_RE = re.compile(r'co[1-6]\s+(.{0,50})')
+_CO_FORMAT_RE = re.compile(r'^CO[1-6]\s+[A-Z]')
+
+# Phrase lists for the VTU / OBE checks, built once instead of per CO
+_TECHNICAL_TERMS = (
+    'sql', 'database', 'query', 'normalization', 'transaction',
+    'schema', 'er model', 'relational', 'index', 'constraint',
+    'mongodb', 'nosql', 'acid', 'trigger', 'view', 'join',
+    'algorithm', 'data structure', 'function', 'optimization'
+)
+_VAGUE_PHRASES = (
+    'understand the basics', 'basic understanding',
+    'general knowledge', 'familiar with', 'awareness of',
+    'know about', 'learn about'
+)
+_MEASURABLE_INDICATORS = (
+    'demonstrate', 'apply', 'create', 'design', 'develop',
+    'implement', 'analyze', 'evaluate', 'solve', 'write',
+    'conduct', 'perform', 'execute', 'produce'
+)
+_PASSIVE_INDICATORS = ('will be understood', 'is learned', 'becomes aware')
+
 VTU_PO_DESCRIPTIONS = {
     "PO1": "Engineering Knowledge",
     "PO2": "Problem Analysis",
@@ -151,7 +218,7 @@ class MetricsEvaluator:
         self.embedding_model = None
         if EMBEDDINGS_AVAILABLE:
             try:
-                self.embedding_model = SentenceTransformer(embedding_model)
+                self.embedding_model = get_embedder(embedding_model)
                 print(f"✅ MetricsEvaluator initialized with {embedding_model}")
             except Exception as e:
                 print(f"⚠️ Could not load embedding model: {e}")
@@ -238,34 +305,23 @@ class MetricsEvaluator:
         co_lower = co_text.lower()
         
         # First pass: Check for verb immediately after CO number (highest confidence)
-        for level in ["Create", "Evaluate", "Analyze", "Apply", "Understand", "Remember"]:
-            verbs = BLOOM_TAXONOMY[level]["verbs"]
-            for verb in verbs:
-                # Check if verb appears right after CO number (primary action verb)
-                pattern = rf'co[1-6]\s+{verb}\b'
-                if re.search(pattern, co_lower):
-                    return level, 0.95
-                # Also check "ability to" pattern for Evaluate level
-                if level == "Evaluate" and re.search(rf'co[1-6]\s+ability\s+to', co_lower):
-                    return level, 0.90
+        match = _best_level_match(_VERB_AFTER_CO_RE.finditer(co_lower), _DETECTION_ORDER)
+        if match:
+            # "ability to" is a weaker Evaluate signal than an explicit verb
+            return match.lastgroup, 0.90 if match.group(0).split()[-1] == "to" else 0.95
         
         # Second pass: Check first 5 words after CO number
-        first_words_match = re.match(r'co[1-6]\s+(.{0,50})', co_lower)
+        first_words_match = _CO_LEAD_RE.match(co_lower)
         if first_words_match:
-            first_part = first_words_match.group(1)
-            for level in ["Create", "Evaluate", "Analyze", "Apply", "Understand", "Remember"]:
-                verbs = BLOOM_TAXONOMY[level]["verbs"]
-                for verb in verbs:
-                    if first_part.startswith(verb):
-                        return level, 0.90
+            match = _VERB_PREFIX_RE.match(first_words_match.group(1))
+            if match:
+                return match.lastgroup, 0.90
         
         # Third pass: Check anywhere (lower confidence)
         # But prioritize by Bloom level order (Apply/Analyze are most common in tech COs)
-        for level in ["Apply", "Analyze", "Evaluate", "Create", "Understand", "Remember"]:
-            verbs = BLOOM_TAXONOMY[level]["verbs"]
-            for verb in verbs:
-                if verb in co_lower:
-                    return level, 0.60
+        match = _best_level_match(_VERB_ANYWHERE_RE.finditer(co_lower), _ANYWHERE_ORDER)
+        if match:
+            return match.lastgroup, 0.60
         
         # Default to Apply if no verb found (most common in technical COs)
         return "Apply", 0.5
@@ -310,42 +366,25 @@ class MetricsEvaluator:
         }
         
         # Check format: CO[1-6] [A-Z]
-        if re.match(r'^CO[1-6]\s+[A-Z]', co_text):
+        if _CO_FORMAT_RE.match(co_text):
             checks['proper_format'] = True
             checks['proper_capitalization'] = True
         
         # Check for action verb at start
         co_lower = co_text.lower()
-        all_verbs = []
-        for level_data in BLOOM_TAXONOMY.values():
-            all_verbs.extend(level_data['verbs'])
         
         # Look for verb right after CO number
-        for verb in all_verbs:
-            if re.search(rf'co[1-6]\s+{verb}', co_lower):
-                checks['action_verb_start'] = True
-                break
+        checks['action_verb_start'] = bool(_ANY_VERB_AFTER_CO_RE.search(co_lower))
         
         # Check length
         word_count = len(co_text.split())
         checks['appropriate_length'] = 15 <= word_count <= 25
         
         # Check for specific technical content
-        technical_terms = [
-            'sql', 'database', 'query', 'normalization', 'transaction',
-            'schema', 'er model', 'relational', 'index', 'constraint',
-            'mongodb', 'nosql', 'acid', 'trigger', 'view', 'join',
-            'algorithm', 'data structure', 'function', 'optimization'
-        ]
-        checks['specific_content'] = any(term in co_lower for term in technical_terms)
+        checks['specific_content'] = any(term in co_lower for term in _TECHNICAL_TERMS)
         
         # Check for vague phrases (negative indicator)
-        vague_phrases = [
-            'understand the basics', 'basic understanding',
-            'general knowledge', 'familiar with', 'awareness of',
-            'know about', 'learn about'
-        ]
-        checks['no_vague_phrases'] = not any(phrase in co_lower for phrase in vague_phrases)
+        checks['no_vague_phrases'] = not any(phrase in co_lower for phrase in _VAGUE_PHRASES)
         
         score = sum(checks.values()) / len(checks)
         
@@ -380,12 +419,7 @@ class MetricsEvaluator:
         co_lower = co_text.lower()
         
         # Check if measurable (contains quantifiable or demonstrable outcomes)
-        measurable_indicators = [
-            'demonstrate', 'apply', 'create', 'design', 'develop',
-            'implement', 'analyze', 'evaluate', 'solve', 'write',
-            'conduct', 'perform', 'execute', 'produce'
-        ]
-        alignment['measurable'] = any(ind in co_lower for ind in measurable_indicators)
+        alignment['measurable'] = any(ind in co_lower for ind in _MEASURABLE_INDICATORS)
         
         # Check if observable
         alignment['observable'] = alignment['measurable']  # Same criterion for now
@@ -399,8 +433,7 @@ class MetricsEvaluator:
             alignment['bloom_aligned'] = any(verb in co_lower for verb in level_verbs)
         
         # Check action-oriented (not passive)
-        passive_indicators = ['will be understood', 'is learned', 'becomes aware']
-        alignment['action_oriented'] = not any(ind in co_lower for ind in passive_indicators)
+        alignment['action_oriented'] = not any(ind in co_lower for ind in _PASSIVE_INDICATORS)
         
         # Check specific outcomes
         alignment['specific_outcomes'] = len(co_text.split()) >= 15
@@ -423,11 +456,17 @@ class MetricsEvaluator:
             return 0.0
         
         try:
-            gen_embedding = self.embedding_model.encode([generated_co])
-            ref_embeddings = self.embedding_model.encode(reference_cos)
+            # Unit-length embeddings from the encoder: cosine is a plain dot
+            # product, with no extra normalized copies of either matrix
+            gen_embedding = self.embedding_model.encode(
+                generated_co, convert_to_numpy=True, normalize_embeddings=True
+            )
+            ref_embeddings = self.embedding_model.encode(
+                reference_cos, convert_to_numpy=True, normalize_embeddings=True
+            )
             
-            similarities = cosine_similarity(gen_embedding, ref_embeddings)[0]
-            return float(max(similarities))  # Best match
+            similarities = ref_embeddings @ gen_embedding
+            return float(similarities.max())  # Best match
         except Exception as e:
             print(f"Similarity calculation error: {e}")
             return 0.0
@@ -3,6 +3,9 @@ Multi-Task Fine-Tuned LLM
 QLoRA fine-tuning for CO generation, Bloom classification, and PO mapping
 """
 import re
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, Tuple, List
 try:
     import torch
@@ -13,6 +16,43 @@ except ImportError:
     TORCH_AVAILABLE = False
     print(" PyTorch/PEFT not available - using mock mode")
 
+# Output-parsing patterns, compiled once at import
+_BLOOM_LINE_RE = re.compile(r"Bloom Level:\s*([^\n]+)", re.IGNORECASE)
+_PO_LINE_RE = re.compile(r"PO Mappings?:\s*([^\n]+)", re.IGNORECASE)
+_CONFIDENCE_RE = re.compile(r"Confidence:\s*([0-9.]+)")
+
+
+@lru_cache(maxsize=16)
+def _co_line_re(co_num: int):
+    """Compiled 'CO<n>: text' pattern for one CO number"""
+    # Only the 'CO' letters vary in case; spelling them out avoids IGNORECASE
+    # case-folding on every character scanned
+    return re.compile(rf"[Cc][Oo]{co_num}:\s*([^\n]+)")
+
+GENERATION_CACHE_SIZE = 256  # Parsed generations kept per model instance
+
+# Static instructions go first and the per-CO details last, so the prompt
+# prefix is identical across CO1-CO6 and prefix/KV caching can reuse it
+CO_PROMPT_HEADER = """Generate a Course Outcome (CO) with complete metadata.
+Each CO must be 15-20 words, descriptive and specific, and unique from previous COs.
+
+"""
+CO_PROMPT_TEMPLATE = CO_PROMPT_HEADER + """CONTEXT FROM SYLLABUS:
+{context}
+
+REQUIREMENTS:
+- CO{co_num} must be at {level} level (Bloom's Taxonomy)
+- Must be unique from previous COs:
+{previous_text}
+
+OUTPUT FORMAT:
+CO{co_num}: [CO text here]
+Bloom Level: {level}
+PO Mappings: PO1, PO2, PO3
+Confidence: 0.85
+
+CO{co_num}:"""
+
 class MultiTaskCOModel:
     """
     Fine-tuned LLM (LLaMA-3/Mistral) with QLoRA:
@@ -27,6 +67,7 @@ class MultiTaskCOModel:
         self.base_model = base_model
         self.lora_path = lora_path
         self.device = "mps" if torch.backends.mps.is_available() else "cpu"
+        self._generation_cache = OrderedDict()  # prompt hash -> parsed result
         
         print(f" Multi-Task Model Layer initialized")
         print(f"   Base: {base_model}")
@@ -90,24 +131,21 @@ class MultiTaskCOModel:
         # Build multi-task prompt
         previous_text = "\n".join([f"- {co}" for co in previous_cos]) if previous_cos else "None"
         
-        prompt = f"""Generate Course Outcome CO{co_num} with complete metadata.
-
-CONTEXT FROM SYLLABUS:
-{context[:2000]}
-
-REQUIREMENTS:
-- CO{co_num} must be at {level} level (Bloom's Taxonomy)
-- Must be 15-20 words, descriptive and specific
-- Must be unique from previous COs:
-{previous_text}
-
-OUTPUT FORMAT:
-CO{co_num}: [CO text here]
-Bloom Level: {level}
-PO Mappings: PO1, PO2, PO3
-Confidence: 0.85
-
-CO{co_num}:"""
+        prompt = CO_PROMPT_TEMPLATE.format(
+            context=context[:2000],
+            co_num=co_num,
+            level=level,
+            previous_text=previous_text
+        )
+        
+        # Same model + same prompt: reuse the parsed result instead of regenerating
+        cache_key = hashlib.blake2b(
+            f"{self.base_model}|{self.lora_path}|{prompt}".encode(), digest_size=16
+        ).hexdigest()
+        cached = self._generation_cache.get(cache_key)
+        if cached is not None:
+            self._generation_cache.move_to_end(cache_key)
+            return dict(cached)
         
         # Tokenize
         inputs = self.tokenizer(
@@ -135,28 +173,28 @@ CO{co_num}:"""
         # Extract CO and metadata
         result = self._parse_multi_task_output(generated, co_num, level)
         
+        self._generation_cache[cache_key] = dict(result)
+        if len(self._generation_cache) > GENERATION_CACHE_SIZE:
+            self._generation_cache.popitem(last=False)
+        
         return result
     
     def _parse_multi_task_output(self, text: str, co_num: int, level: str) -> Dict:
         """Parse multi-task model output"""
         # Extract CO text
-        co_pattern = rf"CO{co_num}:\s*([^\n]+)"
-        co_match = re.search(co_pattern, text, re.IGNORECASE)
+        co_match = _co_line_re(co_num).search(text)
         co_text = co_match.group(1).strip() if co_match else f"CO{co_num} [Generated from context]"
         
         # Extract Bloom level
-        bloom_pattern = r"Bloom Level:\s*([^\n]+)"
-        bloom_match = re.search(bloom_pattern, text, re.IGNORECASE)
+        bloom_match = _BLOOM_LINE_RE.search(text)
         bloom_level = bloom_match.group(1).strip() if bloom_match else level
         
         # Extract PO mappings
-        po_pattern = r"PO Mappings?:\s*([^\n]+)"
-        po_match = re.search(po_pattern, text, re.IGNORECASE)
+        po_match = _PO_LINE_RE.search(text)
         po_mappings = po_match.group(1).strip() if po_match else "PO1, PO2, PO3"
         
         # Extract confidence
-        conf_pattern = r"Confidence:\s*([0-9.]+)"
-        conf_match = re.search(conf_pattern, text)
+        conf_match = _CONFIDENCE_RE.search(text)
         confidence = float(conf_match.group(1)) if conf_match else 0.85
         
         return {
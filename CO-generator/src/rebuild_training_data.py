@@ -9,6 +9,19 @@ os.makedirs(OUT_DIR, exist_ok=True)
 
 TRAIN_PATH = os.path.join(OUT_DIR, "train.jsonl")
 
+# Instruction text shared by every training sample; only the fields vary
+INSTRUCTION_TEMPLATE = """Generate 6 comprehensive Course Outcomes (COs) from this syllabus content. Each CO must be a complete statement with 15-20 words covering major topics.
+
+Syllabus Content:
+{content}
+
+Requirements:
+- CO1-CO4: Mix of {num_apply} Apply and {num_analyze} Analyze levels
+- CO5: Evaluate level (experiments/tools)
+- CO6: Create level (reports/writing)
+- Each CO must be 15-20 words and cover major syllabus topics
+- Format: CO1 [action verb] [detailed statement]"""
+
 def extract_key_topics(content):
     """Extract key topics and concepts from the content"""
     content_lower = content.lower()
@@ -219,38 +232,32 @@ def build_jsonl():
                 cos_output = generate_cos_from_content(chunk, num_apply, num_analyze)
                 
                 # Create instruction with better context
-                instruction = f"""Generate 6 comprehensive Course Outcomes (COs) from this syllabus content. Each CO must be a complete statement with 15-20 words covering major topics.
-
-Syllabus Content:
-{chunk[:4000]}
-
-Requirements:
-- CO1-CO4: Mix of {num_apply} Apply and {num_analyze} Analyze levels
-- CO5: Evaluate level (experiments/tools)
-- CO6: Create level (reports/writing)
-- Each CO must be 15-20 words and cover major syllabus topics
-- Format: CO1 [action verb] [detailed statement]"""
+                instruction = INSTRUCTION_TEMPLATE.format(
+                    content=chunk[:4000],
+                    num_apply=num_apply,
+                    num_analyze=num_analyze
+                )
                 
-                entry = {
-                    "instruction": instruction,
-                    "output": cos_output
-                }
-                data.append(entry)
+                # Serialize once here; only the finished line is kept in memory
+                data.append(json.dumps(
+                    {"instruction": instruction, "output": cos_output},
+                    ensure_ascii=False
+                ) + "\n")
 
     # Shuffle data for better training
     import random
     random.shuffle(data)
 
     with open(TRAIN_PATH, "w", encoding="utf-8") as f:
-        for d in data:
-            f.write(json.dumps(d, ensure_ascii=False) + "\n")
+        f.writelines(data)
 
     print(f"\n✅ JSONL created at: {TRAIN_PATH}")
     print(f"✅ Total samples: {len(data)}")
     print(f"✅ Average samples per file: {len(data) / len(files):.1f}")
     
     print("\n📋 Sample entries:")
-    for i, sample in enumerate(data[:3], 1):
+    for i, line in enumerate(data[:3], 1):
+        sample = json.loads(line)
         print(f"\n--- Sample {i} ---")
         print(f"Instruction length: {len(sample['instruction'])} chars")
         print(f"Output:\n{sample['output']}")
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import ClassVar, Dict, List, Tuple
 import re
 
 class RefinementLayer:
@@ -10,12 +10,38 @@ class RefinementLayer:
     - Faculty preference simulation
     """
     
+    # Verb lists used by every check (shared by all instances, built once)
+    ACTION_VERBS: ClassVar[Tuple[str, ...]] = (
+        'understand', 'apply', 'analyze', 'evaluate', 'create',
+        'demonstrate', 'design', 'develop', 'implement', 'ability'
+    )
+    BLOOM_VERBS: ClassVar[Dict[str, Tuple[str, ...]]] = {
+        'Apply': ('apply', 'use', 'implement', 'demonstrate', 'execute'),
+        'Analyze': ('analyze', 'examine', 'compare', 'differentiate', 'investigate'),
+        'Evaluate': ('evaluate', 'assess', 'justify', 'critique', 'validate'),
+        'Create': ('create', 'design', 'construct', 'develop', 'formulate', 'write')
+    }
+    MEASURABLE_INDICATORS: ClassVar[Tuple[str, ...]] = (
+        'ability', 'demonstrate', 'apply', 'analyze', 'evaluate', 'create'
+    )
+    
+    # Multi-verb matchers: one scan over the CO text instead of one
+    # `verb in text` scan per verb. The action-verb pattern sits in a
+    # lookahead so every (possibly overlapping) occurrence is reported
+    _ACTION_VERB_RE: ClassVar[re.Pattern] = re.compile(
+        '(?=(' + '|'.join(map(re.escape, ACTION_VERBS)) + '))'
+    )
+    _BLOOM_VERB_RE: ClassVar[Dict[str, re.Pattern]] = {
+        level: re.compile('|'.join(map(re.escape, verbs)))
+        for level, verbs in BLOOM_VERBS.items()
+    }
+    _MEASURABLE_RE: ClassVar[re.Pattern] = re.compile(
+        '|'.join(map(re.escape, MEASURABLE_INDICATORS))
+    )
+    
     def __init__(self):
         """Initialize refinement layer"""
-        self.vtu_keywords = [
-            'understand', 'apply', 'analyze', 'evaluate', 'create',
-            'demonstrate', 'design', 'develop', 'implement', 'ability'
-        ]
+        self.vtu_keywords = list(self.ACTION_VERBS)
         print("✅ Refinement Layer initialized (RLHF-ready)")
     
     def score_conciseness(self, co_text: str) -> float:
@@ -48,15 +74,14 @@ class RefinementLayer:
         
         # Check for action verbs
         text_lower = co_text.lower()
-        action_verbs = ['understand', 'apply', 'analyze', 'evaluate', 'create', 
-                       'demonstrate', 'design', 'develop', 'implement', 'ability']
         
-        for verb in action_verbs:
-            if verb in text_lower:
-                checks['has_action_verb'] = True
-                if text_lower.startswith(f'co{co_text[2]} {verb}'):
-                    checks['starts_with_verb'] = True
-                break
+        found = {m.group(1) for m in self._ACTION_VERB_RE.finditer(text_lower)}
+        if found:
+            # First verb in ACTION_VERBS order, as the per-verb loop picked
+            verb = next(v for v in self.ACTION_VERBS if v in found)
+            checks['has_action_verb'] = True
+            if text_lower.startswith(f'co{co_text[2]} {verb}'):
+                checks['starts_with_verb'] = True
         
         # Check length
         word_count = len(co_text.split())
@@ -81,29 +106,19 @@ class RefinementLayer:
         
         # Check Bloom alignment
         text_lower = co_text.lower()
-        bloom_verbs = {
-            'Apply': ['apply', 'use', 'implement', 'demonstrate', 'execute'],
-            'Analyze': ['analyze', 'examine', 'compare', 'differentiate', 'investigate'],
-            'Evaluate': ['evaluate', 'assess', 'justify', 'critique', 'validate'],
-            'Create': ['create', 'design', 'construct', 'develop', 'formulate', 'write']
-        }
-        
-        level_verbs = bloom_verbs.get(bloom_level, [])
-        for verb in level_verbs:
-            if verb in text_lower:
-                alignment['bloom_alignment'] = True
-                break
+        level_re = self._BLOOM_VERB_RE.get(bloom_level)
+        if level_re is not None and level_re.search(text_lower):
+            alignment['bloom_alignment'] = True
         
         # Check PO mapping
         if po_mappings and 'PO' in po_mappings:
             alignment['po_mapping_present'] = True
         
         # Check if measurable (has specific outcomes)
-        measurable_indicators = ['ability', 'demonstrate', 'apply', 'analyze', 'evaluate', 'create']
-        alignment['measurable'] = any(indicator in text_lower for indicator in measurable_indicators)
+        alignment['measurable'] = bool(self._MEASURABLE_RE.search(text_lower))
         
         # Check action-oriented
-        alignment['action_oriented'] = not co_text.lower().startswith(('understanding', 'knowledge of'))
+        alignment['action_oriented'] = not text_lower.startswith(('understanding', 'knowledge of'))
         
         score = sum(alignment.values()) / len(alignment)
         
@@ -6,8 +6,98 @@ that cover all modules comprehensively.
 """
 
 import re
-from typing import List, Dict, Tuple
-from collections import defaultdict
+from typing import ClassVar, List, Dict, Tuple
+from collections import Counter
+
+# Lab tools detected in syllabus text, in the order they are reported
+_TOOL_RE = re.compile(r'mysql|mongo|oracle', re.IGNORECASE)
+_TOOL_MAP = {'mysql': 'MySQL', 'mongo': 'MongoDB', 'oracle': 'Oracle'}
+_DEFAULT_TOOLS = ['MySQL', 'MongoDB']
+
+_PO_RE = re.compile(r'PO\d+')
+_CO_RE = re.compile(r'CO\d')
+_QUALITY_RE = re.compile(r'understand|apply|analy[sz]e|demonstrate|ability|write', re.IGNORECASE)
+
+
+# CO1-CO4 templates for generate_custom_cos: (text, topics covered, PO mappings)
+_APPLY_TEMPLATES = (
+    ("Apply DBMS concepts to design and create databases that address specific real-world scenarios", 
+     ('database design', 'ER modeling', 'schema design'), 'PO1, PO2, PO3'),
+    ("Apply normalization techniques to database schemas to eliminate redundancy and ensure data integrity",
+     ('normalization', 'functional dependencies', 'normal forms'), 'PO1, PO2, PO4'),
+    ("Demonstrate proficiency in SQL and relational algebra query processing for data manipulation",
+     ('SQL', 'relational algebra', 'query processing'), 'PO1, PO3, PO5'),
+    ("Apply database constraints and integrity rules to maintain data consistency and validity",
+     ('constraints', 'data integrity', 'validation'), 'PO1, PO2, PO3'),
+)
+
+_ANALYZE_TEMPLATES = (
+    ("Analyse given scenarios and apply suitable database techniques including normalization and functional dependencies",
+     ('normalization', 'functional dependencies', 'database techniques'), 'PO1, PO2, PO4'),
+    ("Analyse scenarios involving transaction management and concurrency control using ACID properties",
+     ('transaction management', 'concurrency control', 'ACID properties'), 'PO1, PO2, PO4'),
+    ("Analyse query optimization techniques and execution plans for database performance improvement",
+     ('query optimization', 'execution plans', 'performance'), 'PO1, PO3, PO5'),
+    ("Analyse database design requirements and evaluate different schema approaches for optimal solutions",
+     ('database design', 'schema analysis', 'requirements'), 'PO1, PO2, PO4'),
+)
+
+# Fixed VTU DBMS CO set returned by generate_cos ({tools_str} is filled per call)
+_STATIC_COS = (
+    {
+        'co_num': 1,
+        'co_text': "CO1 Understand the fundamentals of databases and database management systems",
+        'bloom_level': 'Understand',
+        'po_mappings': 'PO1, PO2',
+        'module_coverage': 'Module 1'
+    },
+    {
+        'co_num': 2,
+        'co_text': "CO2 Apply DBMS concepts to design and create databases that address specific real-world scenarios using ER modeling",
+        'bloom_level': 'Apply',
+        'po_mappings': 'PO1, PO2, PO3',
+        'module_coverage': 'Module 2'
+    },
+    {
+        'co_num': 3,
+        'co_text': "CO3 Analyse given scenarios and apply suitable database techniques including normalization and query optimization",
+        'bloom_level': 'Analyze',
+        'po_mappings': 'PO1, PO2, PO4',
+        'module_coverage': 'Module 3, 4'
+    },
+    {
+        'co_num': 4,
+        'co_text': "CO4 Demonstrate proficiency in SQL queries and relational algebra operations for data manipulation and retrieval",
+        'bloom_level': 'Apply',
+        'po_mappings': 'PO1, PO3, PO5',
+        'module_coverage': 'Module 1, 3'
+    },
+    {
+        'co_num': 5,
+        'co_text': "CO5 Ability to conduct experiments as individual or team using modern database tools like {tools_str}",
+        'bloom_level': 'Evaluate',
+        'po_mappings': 'PO4, PO5, PO9',
+        'module_coverage': 'Module 5'
+    },
+    {
+        'co_num': 6,
+        'co_text': "CO6 Write clear and concise experiment reports detailing the methods, results, and conclusions of DBMS experiments",
+        'bloom_level': 'Create',
+        'po_mappings': 'PO10, PO12',
+        'module_coverage': 'All Modules'
+    },
+)
+
+
+def _detect_tools(text: str, candidates: Tuple[str, ...] = ('MySQL', 'MongoDB', 'Oracle')) -> List[str]:
+    """Return the candidate tools mentioned in text (single regex scan)"""
+    found = set()
+    for match in _TOOL_RE.finditer(text):
+        found.add(_TOOL_MAP[match.group(0).lower()])
+        if len(found) == len(_TOOL_MAP):
+            break
+    tools = [tool for tool in candidates if tool in found]
+    return tools or list(_DEFAULT_TOOLS)
 
 # ============================================================================
 # TOPIC EXTRACTION
@@ -99,37 +189,37 @@ class TopicExtractor:
 class VTUCOGenerator:
     """Generate VTU-aligned Course Outcomes based on syllabus"""
     
+    # VTU CO Templates based on Bloom's Taxonomy (shared by all instances)
+    co_templates: ClassVar[Dict[str, Tuple[str, ...]]] = {
+        'Understand': (
+            "Understand the fundamentals of {topic} and their applications in database systems",
+            "Understand the concepts of {topic} and database management principles",
+            "Understand the basics of {topic} and database system architecture",
+        ),
+        'Apply': (
+            "Apply {topic} concepts to design and create databases that address specific real-world scenarios",
+            "Apply {topic} techniques to implement database solutions for practical applications",
+            "Demonstrate the ability to use {topic} for database design and implementation",
+        ),
+        'Analyze': (
+            "Analyse given scenarios and apply suitable {topic} techniques to solve database problems",
+            "Analyse database requirements and apply {topic} for optimal solutions",
+            "Analyse and evaluate {topic} approaches for database system design",
+        ),
+        'Evaluate': (
+            "Ability to conduct experiments as individual or team using modern tools like {tools}",
+            "Evaluate and compare different {topic} approaches using industry-standard tools",
+            "Ability to perform hands-on experiments with {tools} for database management",
+        ),
+        'Create': (
+            "Write clear and concise experiment reports detailing the methods, results, and conclusions of {topic} experiments",
+            "Design and document comprehensive database solutions using {topic} principles",
+            "Create detailed technical reports documenting {topic} implementations and findings",
+        )
+    }
+    
     def __init__(self):
         self.extractor = TopicExtractor()
-        
-        # VTU CO Templates based on Bloom's Taxonomy
-        self.co_templates = {
-            'Understand': [
-                "Understand the fundamentals of {topic} and their applications in database systems",
-                "Understand the concepts of {topic} and database management principles",
-                "Understand the basics of {topic} and database system architecture",
-            ],
-            'Apply': [
-                "Apply {topic} concepts to design and create databases that address specific real-world scenarios",
-                "Apply {topic} techniques to implement database solutions for practical applications",
-                "Demonstrate the ability to use {topic} for database design and implementation",
-            ],
-            'Analyze': [
-                "Analyse given scenarios and apply suitable {topic} techniques to solve database problems",
-                "Analyse database requirements and apply {topic} for optimal solutions",
-                "Analyse and evaluate {topic} approaches for database system design",
-            ],
-            'Evaluate': [
-                "Ability to conduct experiments as individual or team using modern tools like {tools}",
-                "Evaluate and compare different {topic} approaches using industry-standard tools",
-                "Ability to perform hands-on experiments with {tools} for database management",
-            ],
-            'Create': [
-                "Write clear and concise experiment reports detailing the methods, results, and conclusions of {topic} experiments",
-                "Design and document comprehensive database solutions using {topic} principles",
-                "Create detailed technical reports documenting {topic} implementations and findings",
-            ]
-        }
     
     def generate_cos(self, text: str, num_apply: int = 2, num_analyze: int = 2) -> List[Dict]:
         """
@@ -143,110 +233,14 @@ class VTUCOGenerator:
         Returns:
             List of 6 CO dictionaries
         """
-        # Extract topics
-        modules = self.extractor.extract_modules_from_text(text)
-        specific_topics = self.extractor.extract_specific_topics(text)
-        
-        # Build Bloom level sequence
-        # First 4 COs: mix of Apply and Analyze
-        # CO5: Evaluate, CO6: Create
-        bloom_sequence = []
-        
-        # For typical DBMS: CO1 is often Understand, CO2-CO4 are Apply/Analyze
-        bloom_sequence.append('Understand')  # CO1 - basics
-        
-        # Remaining CO2-CO4 based on user preference
-        remaining_apply = num_apply
-        remaining_analyze = num_analyze
-        
-        # If user wants 2 Apply + 2 Analyze, CO1 counts as 1
-        # Adjust: CO1 is Understand, so we have 3 more for Apply/Analyze
-        for i in range(3):  # CO2, CO3, CO4
-            if remaining_apply > 0:
-                bloom_sequence.append('Apply')
-                remaining_apply -= 1
-            elif remaining_analyze > 0:
-                bloom_sequence.append('Analyze')
-                remaining_analyze -= 1
-        
-        bloom_sequence.append('Evaluate')  # CO5
-        bloom_sequence.append('Create')    # CO6
-        
-        # Determine tools mentioned
-        tools = []
-        text_lower = text.lower()
-        if 'mysql' in text_lower:
-            tools.append('MySQL')
-        if 'mongodb' in text_lower or 'mongo' in text_lower:
-            tools.append('MongoDB')
-        if not tools:
-            tools = ['MySQL', 'MongoDB']  # Default
-        tools_str = ' and '.join(tools)
-        
-        # Generate COs
-        cos = []
-        
-        # CO1: Understand basics (Module 1)
-        co1 = {
-            'co_num': 1,
-            'co_text': "CO1 Understand the fundamentals of databases and database management systems",
-            'bloom_level': 'Understand',
-            'po_mappings': 'PO1, PO2',
-            'module_coverage': 'Module 1'
-        }
-        cos.append(co1)
-        
-        # CO2: Apply - Database Design (Module 2 - ER Modeling)
-        co2 = {
-            'co_num': 2,
-            'co_text': "CO2 Apply DBMS concepts to design and create databases that address specific real-world scenarios using ER modeling",
-            'bloom_level': 'Apply',
-            'po_mappings': 'PO1, PO2, PO3',
-            'module_coverage': 'Module 2'
-        }
-        cos.append(co2)
-        
-        # CO3: Analyze - Database Techniques (Module 3/4)
-        co3 = {
-            'co_num': 3,
-            'co_text': "CO3 Analyse given scenarios and apply suitable database techniques including normalization and query optimization",
-            'bloom_level': 'Analyze',
-            'po_mappings': 'PO1, PO2, PO4',
-            'module_coverage': 'Module 3, 4'
-        }
-        cos.append(co3)
-        
-        # CO4: Apply/Demonstrate - SQL and Relational Algebra (Module 3)
-        co4 = {
-            'co_num': 4,
-            'co_text': "CO4 Demonstrate proficiency in SQL queries and relational algebra operations for data manipulation and retrieval",
-            'bloom_level': 'Apply',
-            'po_mappings': 'PO1, PO3, PO5',
-            'module_coverage': 'Module 1, 3'
-        }
-        cos.append(co4)
-        
-        # CO5: Evaluate - Experiments with Tools (Module 5)
-        co5 = {
-            'co_num': 5,
-            'co_text': f"CO5 Ability to conduct experiments as individual or team using modern database tools like {tools_str}",
-            'bloom_level': 'Evaluate',
-            'po_mappings': 'PO4, PO5, PO9',
-            'module_coverage': 'Module 5'
-        }
-        cos.append(co5)
-        
-        # CO6: Create - Reports (Lab work)
-        co6 = {
-            'co_num': 6,
-            'co_text': "CO6 Write clear and concise experiment reports detailing the methods, results, and conclusions of DBMS experiments",
-            'bloom_level': 'Create',
-            'po_mappings': 'PO10, PO12',
-            'module_coverage': 'All Modules'
-        }
-        cos.append(co6)
+        # The DBMS CO set is fixed; only the detected lab tools vary.
+        # num_apply/num_analyze are accepted for API compatibility.
+        tools_str = ' and '.join(_detect_tools(text, ('MySQL', 'MongoDB')))
         
-        return cos
+        return [
+            {**co, 'co_text': co['co_text'].format(tools_str=tools_str)}
+            for co in _STATIC_COS
+        ]
     
     def generate_custom_cos(self, text: str, num_apply: int = 2, num_analyze: int = 2) -> List[Dict]:
         """
@@ -257,20 +251,8 @@ class VTUCOGenerator:
         CO5: Always Evaluate
         CO6: Always Create
         """
-        topics = self.extractor.extract_specific_topics(text)
-        modules = self.extractor.extract_modules_from_text(text)
-        
-        # Detect tools
-        text_lower = text.lower()
-        tools = []
-        if 'mysql' in text_lower:
-            tools.append('MySQL')
-        if 'mongodb' in text_lower or 'mongo' in text_lower:
-            tools.append('MongoDB')
-        if 'oracle' in text_lower:
-            tools.append('Oracle')
-        if not tools:
-            tools = ['MySQL', 'MongoDB']
+        # CO1-CO4 come from fixed templates; only the lab tools depend on text
+        tools = _detect_tools(text)
         tools_str = ' and '.join(tools)
         
         # Build Bloom level sequence for CO1-CO4 based on user config
@@ -283,29 +265,6 @@ class VTUCOGenerator:
         bloom_sequence.append('Evaluate')  # CO5
         bloom_sequence.append('Create')    # CO6
         
-        # CO templates based on Bloom level
-        apply_templates = [
-            ("Apply DBMS concepts to design and create databases that address specific real-world scenarios", 
-             ['database design', 'ER modeling', 'schema design'], 'PO1, PO2, PO3'),
-            ("Apply normalization techniques to database schemas to eliminate redundancy and ensure data integrity",
-             ['normalization', 'functional dependencies', 'normal forms'], 'PO1, PO2, PO4'),
-            ("Demonstrate proficiency in SQL and relational algebra query processing for data manipulation",
-             ['SQL', 'relational algebra', 'query processing'], 'PO1, PO3, PO5'),
-            ("Apply database constraints and integrity rules to maintain data consistency and validity",
-             ['constraints', 'data integrity', 'validation'], 'PO1, PO2, PO3'),
-        ]
-        
-        analyze_templates = [
-            ("Analyse given scenarios and apply suitable database techniques including normalization and functional dependencies",
-             ['normalization', 'functional dependencies', 'database techniques'], 'PO1, PO2, PO4'),
-            ("Analyse scenarios involving transaction management and concurrency control using ACID properties",
-             ['transaction management', 'concurrency control', 'ACID properties'], 'PO1, PO2, PO4'),
-            ("Analyse query optimization techniques and execution plans for database performance improvement",
-             ['query optimization', 'execution plans', 'performance'], 'PO1, PO3, PO5'),
-            ("Analyse database design requirements and evaluate different schema approaches for optimal solutions",
-             ['database design', 'schema analysis', 'requirements'], 'PO1, PO2, PO4'),
-        ]
-        
         cos = []
         apply_idx = 0
         analyze_idx = 0
@@ -316,10 +275,10 @@ class VTUCOGenerator:
             bloom_level = bloom_sequence[i]
             
             if bloom_level == 'Apply':
-                template = apply_templates[apply_idx % len(apply_templates)]
+                template = _APPLY_TEMPLATES[apply_idx % len(_APPLY_TEMPLATES)]
                 apply_idx += 1
             else:  # Analyze
-                template = analyze_templates[analyze_idx % len(analyze_templates)]
+                template = _ANALYZE_TEMPLATES[analyze_idx % len(_ANALYZE_TEMPLATES)]
                 analyze_idx += 1
             
             co_text, topics_covered, po_mappings = template
@@ -329,7 +288,7 @@ class VTUCOGenerator:
                 'co_text': f"CO{co_num} {co_text}",
                 'bloom_level': bloom_level,
                 'po_mappings': po_mappings,
-                'topics_covered': topics_covered
+                'topics_covered': list(topics_covered)
             })
         
         # CO5: Evaluate - Tools (always fixed)
@@ -368,7 +327,7 @@ def evaluate_generated_cos(cos: List[Dict]) -> Dict:
     """Evaluate quality of generated COs"""
     results = {
         'total_cos': len(cos),
-        'bloom_distribution': defaultdict(int),
+        'bloom_distribution': Counter(co['bloom_level'] for co in cos),
         'avg_word_count': 0,
         'po_coverage': set(),
         'quality_score': 0.0
@@ -378,26 +337,22 @@ def evaluate_generated_cos(cos: List[Dict]) -> Dict:
     quality_checks = 0
     
     for co in cos:
-        # Bloom distribution
-        results['bloom_distribution'][co['bloom_level']] += 1
-        
         # Word count
         words = len(co['co_text'].split())
         total_words += words
         
         # PO coverage
         if 'po_mappings' in co:
-            pos = re.findall(r'PO\d+', co['po_mappings'])
+            pos = _PO_RE.findall(co['po_mappings'])
             results['po_coverage'].update(pos)
         
         # Quality checks
         text = co['co_text']
-        if len(text) > 50:  # Minimum length
-            quality_checks += 1
-        if any(verb in text.lower() for verb in ['understand', 'apply', 'analyse', 'analyze', 'demonstrate', 'ability', 'write']):
-            quality_checks += 1
-        if re.match(r'CO\d', text):
-            quality_checks += 1
+        quality_checks += (
+            (len(text) > 50)  # Minimum length
+            + bool(_QUALITY_RE.search(text))
+            + bool(_CO_RE.match(text))
+        )
     
     results['avg_word_count'] = total_words / len(cos) if cos else 0
     results['po_coverage'] = len(results['po_coverage'])
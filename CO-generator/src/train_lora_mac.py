@@ -60,23 +60,51 @@ model.to(device)
 # -----------------------------
 # PREPROCESS FUNCTION
 # -----------------------------
-def preprocess(example):
-    prompt = f"Instruction: {example['instruction']}\n\nCOs:"
-    output = example["output"]
-    text = prompt + output
+def preprocess(batch):
+    texts = [
+        f"Instruction: {instruction}\n\nCOs:{output}"
+        for instruction, output in zip(batch["instruction"], batch["output"])
+    ]
 
     tokenized = tokenizer(
-        text,
+        texts,
         truncation=True,
-        padding="max_length",
-        max_length=512
+        max_length=511  # leave room for EOS
     )
 
-    tokenized["labels"] = tokenized["input_ids"].copy()
+    # The tokenizer adds no EOS; append it so the model learns to stop
+    for ids, mask in zip(tokenized["input_ids"], tokenized["attention_mask"]):
+        ids.append(tokenizer.eos_token_id)
+        mask.append(1)
+
+    # No padding here: the collator pads each batch to its longest example
+    # and builds the labels, so no compute is spent on 512-token padding
+    tokenized["length"] = [len(ids) for ids in tokenized["input_ids"]]
     return tokenized
 
+def collate(features):
+    """Pad a batch and mask only the padding in the labels.
+
+    pad_token is eos_token, so DataCollatorForLanguageModeling (which masks
+    by pad_token_id) would also mask the real EOS; mask by attention_mask.
+    """
+    batch = tokenizer.pad(
+        [{"input_ids": f["input_ids"], "attention_mask": f["attention_mask"]} for f in features],
+        return_tensors="pt",
+    )
+    labels = batch["input_ids"].clone()
+    labels[batch["attention_mask"] == 0] = -100
+    batch["labels"] = labels
+    return batch
+
 print("Tokenizing...")
-dataset = data.map(preprocess, batched=False)
+# Tokenize 1000 rows per call so the fast tokenizer works on whole batches
+dataset = data.map(
+    preprocess,
+    batched=True,
+    batch_size=1000,
+    remove_columns=data["train"].column_names
+)
 
 # -----------------------------
 # TRAINING ARGUMENTS
@@ -89,6 +117,8 @@ training_args = TrainingArguments(
     num_train_epochs=3,
     logging_steps=10,
     save_strategy="epoch",
+    group_by_length=True,       # Batch similar-length examples together
+    length_column_name="length",
     
     fp16=False,        # MPS does NOT support fp16
     bf16=False,        # Also avoid bf16 on MPS
@@ -101,6 +131,7 @@ training_args = TrainingArguments(
 trainer = Trainer(
     model=model,
     args=training_args,
+    data_collator=collate,
     train_dataset=dataset["train"],
 )
 
@@ -6,14 +6,25 @@ from transformers import (
     TrainingArguments,
     Trainer
 )
-from peft import LoraConfig, get_peft_model
+from peft import LoraConfig, get_peft_model, prepare_model_for_kbit_training
+
+# Optional: 4-bit QLoRA on CUDA (pip install bitsandbytes)
+try:
+    import bitsandbytes  # noqa: F401
+    from transformers import BitsAndBytesConfig
+    BNB_AVAILABLE = True
+except ImportError:
+    BNB_AVAILABLE = False
 
 MODEL_NAME = "Qwen/Qwen2.5-0.5B-Instruct"
 DATA_PATH = "data/jsonl/train.jsonl"
 
-device = "mps" if torch.backends.mps.is_available() else "cpu"
+use_cuda = torch.cuda.is_available()
+device = "cuda" if use_cuda else ("mps" if torch.backends.mps.is_available() else "cpu")
 print("Device:", device)
 
+use_4bit = use_cuda and BNB_AVAILABLE
+
 # -----------------------------
 # LOAD DATASET
 # -----------------------------
@@ -28,12 +39,29 @@ print("Loading tokenizer and model...")
 tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, use_fast=True)
 tokenizer.pad_token = tokenizer.eos_token
 
-model = AutoModelForCausalLM.from_pretrained(
-    MODEL_NAME,
-    torch_dtype=torch.float32,
-    device_map=None
-)
-model.to(device)
+if use_4bit:
+    # QLoRA: frozen backbone stored as 4-bit NF4, compute and adapters in bf16
+    print("Loading 4-bit NF4 base model (QLoRA)...")
+    bnb_config = BitsAndBytesConfig(
+        load_in_4bit=True,
+        bnb_4bit_quant_type="nf4",
+        bnb_4bit_use_double_quant=True,
+        bnb_4bit_compute_dtype=torch.bfloat16
+    )
+    model = AutoModelForCausalLM.from_pretrained(
+        MODEL_NAME,
+        quantization_config=bnb_config,
+        torch_dtype=torch.bfloat16,
+        device_map={"": 0}
+    )
+    model = prepare_model_for_kbit_training(model)
+else:
+    model = AutoModelForCausalLM.from_pretrained(
+        MODEL_NAME,
+        torch_dtype=torch.bfloat16 if use_cuda else torch.float32,  # bf16 on CUDA, fp32 on MPS/CPU
+        device_map=None
+    )
+    model.to(device)
 
 # -----------------------------
 # LORA CONFIG
@@ -51,31 +79,64 @@ lora_config = LoraConfig(
 model = get_peft_model(model, lora_config)
 model.print_trainable_parameters()
 
+if use_cuda:
+    # Trade some recompute for much lower activation memory
+    model.gradient_checkpointing_enable(gradient_checkpointing_kwargs={"use_reentrant": False})
+    model.enable_input_require_grads()
+
 # -----------------------------
 # PREPROCESS FUNCTION
 # -----------------------------
-def preprocess(example):
+def preprocess(batch):
     # Match the format used in train_lora_mac.py for consistency
-    prompt = f"Generate 6 concise Course Outcomes (COs) from this module content:\n{example['instruction']}\n\nCOs:\n"
-    text = prompt + example["output"]
+    texts = [
+        f"Generate 6 concise Course Outcomes (COs) from this module content:\n{instruction}\n\nCOs:\n{output}"
+        for instruction, output in zip(batch["instruction"], batch["output"])
+    ]
 
     tokenized = tokenizer(
-        text,
+        texts,
         truncation=True,
-        padding="max_length",
-        max_length=512
+        max_length=511  # leave room for EOS
     )
 
-    tokenized["labels"] = tokenized["input_ids"].copy()
+    # The tokenizer adds no EOS; append it so the model learns to stop
+    for ids, mask in zip(tokenized["input_ids"], tokenized["attention_mask"]):
+        ids.append(tokenizer.eos_token_id)
+        mask.append(1)
+
+    # No padding here: the collator pads each batch to its longest example
+    # and builds the labels, so no compute is spent on 512-token padding
+    tokenized["length"] = [len(ids) for ids in tokenized["input_ids"]]
     return tokenized
 
+def collate(features):
+    """Pad a batch and mask only the padding in the labels.
+
+    pad_token is eos_token, so DataCollatorForLanguageModeling (which masks
+    by pad_token_id) would also mask the real EOS; mask by attention_mask.
+    """
+    batch = tokenizer.pad(
+        [{"input_ids": f["input_ids"], "attention_mask": f["attention_mask"]} for f in features],
+        # Pad to multiples of 8 so compiled graphs see few distinct shapes
+        pad_to_multiple_of=8 if use_cuda else None,
+        return_tensors="pt",
+    )
+    labels = batch["input_ids"].clone()
+    labels[batch["attention_mask"] == 0] = -100
+    batch["labels"] = labels
+    return batch
+
 # -----------------------------
 # MAP DATASET SAFELY
 # -----------------------------
 print("Tokenizing dataset...")
 
+# Tokenize 1000 rows per call so the fast tokenizer works on whole batches
 tokenized_dataset = train_dataset.map(
     preprocess,
+    batched=True,
+    batch_size=1000,
     remove_columns=train_dataset.column_names
 )
 
@@ -90,9 +151,16 @@ training_args = TrainingArguments(
     num_train_epochs=3,
     logging_steps=10,
     save_strategy="epoch",
+    group_by_length=True,       # Batch similar-length examples together
+    length_column_name="length",
     fp16=False,  # MPS doesn't support fp16
-    bf16=False,
-    no_cuda=True,  # Use MPS instead
+    bf16=use_cuda,  # bf16 only on CUDA
+    no_cuda=not use_cuda,  # Use MPS/CPU when CUDA is missing
+    gradient_checkpointing=use_cuda,
+    gradient_checkpointing_kwargs={"use_reentrant": False} if use_cuda else None,
+    optim="adamw_torch_fused" if use_cuda else "adamw_torch",
+    # Inductor kernel fusion on CUDA (bitsandbytes 4-bit layers don't compile cleanly)
+    torch_compile=use_cuda and not use_4bit,
 )
 
 # -----------------------------
@@ -101,6 +169,7 @@ training_args = TrainingArguments(
 trainer = Trainer(
     model=model,
     args=training_args,
+    data_collator=collate,
     train_dataset=tokenized_dataset,
 )
 
@@ -710,13 +710,15 @@ export const getTeacherCourses = async (req, res) => {
   try {
     const teacherId = req.user.id;
 
-    const result = await query(
-      `SELECT id, code, name, semester, year, department, created_at
+    // Named statement: each pooled connection plans it once and reuses the plan
+    const result = await query({
+      name: 'get-teacher-courses',
+      text: `SELECT id, code, name, semester, year, department, created_at
        FROM courses
        WHERE teacher_id = $1
        ORDER BY created_at DESC`,
-      [teacherId]
-    );
+      values: [teacherId]
+    });
 
     res.json({
       success: true,
@@ -766,18 +768,24 @@ export const saveCourseOutcomes = async (req, res) => {
     // Delete existing COs for this course
     await query('DELETE FROM course_outcomes WHERE course_id = $1', [courseId]);
 
-    // Insert new COs
-    const insertPromises = course_outcomes.map((co, index) => {
-      return query(
+    // Insert new COs in one multi-row statement ($1 is the shared course id)
+    let savedCOs = [];
+    if (course_outcomes.length > 0) {
+      const params = [courseId];
+      const rows = course_outcomes.map((co, index) => {
+        params.push(co.co_number || (index + 1), co.co_text || co.description, co.bloom_level || 'Apply');
+        const n = params.length;
+        return `($1, $${n - 2}, $${n - 1}, $${n})`;
+      });
+
+      const result = await query(
         `INSERT INTO course_outcomes (course_id, co_number, description, bloom_level)
-         VALUES ($1, $2, $3, $4)
+         VALUES ${rows.join(', ')}
          RETURNING *`,
-        [courseId, co.co_number || (index + 1), co.co_text || co.description, co.bloom_level || 'Apply']
+        params
       );
-    });
-
-    const results = await Promise.all(insertPromises);
-    const savedCOs = results.map(r => r.rows[0]);
+      savedCOs = result.rows;
+    }
 
     res.json({
       success: true,
@@ -0,0 +1,5 @@
+CREATE INDEX IF NOT EXISTS idx_courses_teacher_created
+    -- Teacher course lists: WHERE teacher_id = $1 ORDER BY created_at DESC
+    -- (course_outcomes lookups by course_id ORDER BY co_number are already
+    -- served by its UNIQUE (course_id, co_number) index)
+    ON courses(teacher_id, created_at DESC);
@@ -77,6 +77,19 @@ router.get('/course/:courseId/vertical-analysis', authenticateToken, async (req,
 router.get('/course/:courseId/horizontal-analysis', authenticateToken, async (req, res) => {
   try {
     const { courseId } = req.params;
+    const { usn, assessmentType } = req.query;
+
+    // Optional filters, so per-student callers don't fetch the whole course
+    const params = [courseId];
+    let filters = '';
+    if (usn) {
+      params.push(usn);
+      filters += ` AND UPPER(sha.usn) = UPPER($${params.length})`;
+    }
+    if (assessmentType) {
+      params.push(assessmentType);
+      filters += ` AND fls.assessment_type = $${params.length}`;
+    }
 
     const result = await pool.query(`
       SELECT
@@ -86,9 +99,9 @@ router.get('/course/:courseId/horizontal-analysis', authenticateToken, async (re
       FROM student_horizontal_analysis sha
       JOIN marksheets m ON sha.marksheet_id = m.id
       JOIN file_level_summary fls ON sha.marksheet_id = fls.marksheet_id
-      WHERE sha.course_id = $1
+      WHERE sha.course_id = $1${filters}
       ORDER BY sha.usn, fls.assessment_type
-    `, [courseId]);
+    `, params);
 
     res.json({
       success: true,
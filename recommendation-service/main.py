@@ -10,11 +10,14 @@ from typing import List, Optional, Dict, Any
 import logging
 from datetime import datetime
 import os
+import time
+import traceback
 
 from api import recommendations, analytics, resources, feedback
 from models.schemas import HealthCheck
 from core.config import settings
 from core.logging_config import setup_logging
+from services.backend_client import BackendClient
 
 # Setup logging
 setup_logging()
@@ -45,6 +48,21 @@ app.include_router(resources.router, prefix="/api/resources", tags=["Resources"]
 app.include_router(feedback.router, prefix="/api/feedback", tags=["Feedback"])
 
 
+# Probe and status responses only need second precision, so the ISO
+# string is rebuilt once per second instead of on every request
+_ts_cache = {"sec": 0, "iso": ""}
+
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO string, cached per second"""
+    sec = int(time.time())
+    cache = _ts_cache
+    if cache["sec"] != sec:
+        cache["iso"] = datetime.utcfromtimestamp(sec).isoformat()
+        cache["sec"] = sec
+    return cache["iso"]
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
@@ -63,6 +81,7 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down Recommendation Service...")
+    await BackendClient.aclose()
 
 
 @app.get("/", response_model=Dict[str, Any])
@@ -72,7 +91,7 @@ async def root():
         "service": "Educational Recommendation System",
         "version": "2.0.0",
         "status": "operational",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _now_iso(),
         "endpoints": {
             "docs": "/docs",
             "health": "/health",
@@ -89,7 +108,7 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _now_iso(),
         "version": "2.0.0",
         "environment": settings.ENVIRONMENT
     }
@@ -101,7 +120,7 @@ async def api_status():
     return {
         "service": "recommendation-service",
         "status": "operational",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _now_iso(),
         "version": "2.0.0",
         "features": {
             "collaborative_filtering": True,
@@ -118,15 +137,20 @@ async def api_status():
 
 
 # Error handlers
+TRACEBACK_LIMIT = 5  # Frames kept in unhandled-exception logs
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions"""
+    # Expected client/server errors: one line, no traceback formatting
+    logger.warning(f"{exc.status_code}: {exc.detail}")
     return JSONResponse(
         status_code=exc.status_code,
         content={
             "success": False,
             "error": exc.detail,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _now_iso()
         }
     )
 
@@ -134,14 +158,17 @@ async def http_exception_handler(request, exc):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Handle general exceptions"""
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+    # Cap the traceback at the innermost frames; a full format_exc() walks
+    # (and reads source lines for) the whole stack
+    tb = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__, limit=-TRACEBACK_LIMIT))
+    logger.error(f"Unhandled exception: {str(exc)}\n{tb}")
     return JSONResponse(
         status_code=500,
         content={
             "success": False,
             "error": "Internal server error",
             "details": str(exc) if settings.ENVIRONMENT == "development" else None,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _now_iso()
         }
     )
 
@@ -13,26 +13,49 @@ logger = logging.getLogger(__name__)
 class BackendClient:
     """Client for interacting with the main backend API"""
     
+    # One pooled HTTP client per process, shared by every BackendClient, so
+    # keep-alive connections to the backend are reused instead of paying a
+    # new TCP (and TLS) handshake on each request
+    _shared_client: Optional[httpx.AsyncClient] = None
+    
     def __init__(self):
         self.base_url = settings.BACKEND_API_URL
         self.timeout = 30.0
     
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared pooled client, creating it on first use"""
+        client = BackendClient._shared_client
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+            )
+            BackendClient._shared_client = client
+        return client
+    
+    @classmethod
+    async def aclose(cls):
+        """Close the shared HTTP client (called on application shutdown)"""
+        if cls._shared_client is not None:
+            await cls._shared_client.aclose()
+            cls._shared_client = None
+    
     async def _make_request(self, endpoint: str, method: str = "GET", **kwargs) -> Dict[str, Any]:
         """Make HTTP request to backend"""
         url = f"{self.base_url}{endpoint}"
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                if method == "GET":
-                    response = await client.get(url, **kwargs)
-                elif method == "POST":
-                    response = await client.post(url, **kwargs)
-                else:
-                    raise ValueError(f"Unsupported method: {method}")
-                
-                response.raise_for_status()
-                return response.json()
-                
+            client = self._get_client()
+            if method == "GET":
+                response = await client.get(url, **kwargs)
+            elif method == "POST":
+                response = await client.post(url, **kwargs)
+            else:
+                raise ValueError(f"Unsupported method: {method}")
+            
+            response.raise_for_status()
+            return response.json()
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error {e.response.status_code} for {url}: {e.response.text}")
             return {}
@@ -73,12 +96,23 @@ class BackendClient:
     
     async def get_horizontal_analysis(
         self, 
-        course_id: int
+        course_id: int,
+        usn: Optional[str] = None,
+        assessment_type: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Get horizontal analysis (per-student) for a course"""
+        """
+        Get horizontal analysis (per-student) for a course, optionally
+        filtered by the backend to one student and/or assessment type
+        """
+        params = {}
+        if usn:
+            params["usn"] = usn
+        if assessment_type:
+            params["assessmentType"] = assessment_type
         try:
             response = await self._make_request(
-                f"/detailed-calculations/course/{course_id}/horizontal-analysis"
+                f"/detailed-calculations/course/{course_id}/horizontal-analysis",
+                params=params or None
             )
             if response.get("success"):
                 return response.get("data", [])
@@ -99,9 +133,12 @@ class BackendClient:
         This provides question-level marks which we can use for recommendations
         """
         try:
-            horizontal_data = await self.get_horizontal_analysis(course_id)
+            # Filtered in SQL, so only this student's rows come over the wire
+            horizontal_data = await self.get_horizontal_analysis(
+                course_id, usn=usn, assessment_type=assessment_type
+            )
             
-            # Filter by USN
+            # Filter by USN (still applied, for backends without the filters)
             student_data = [
                 record for record in horizontal_data 
                 if record.get("usn", "").upper() == usn.upper()
@@ -2,12 +2,14 @@
 Resource Management Service
 """
 
+import asyncio
 import pandas as pd
 import logging
 from typing import List, Optional, Dict, Any
 from core.config import settings
 from fastapi import UploadFile
 import os
+import tempfile
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,10 @@ logger = logging.getLogger(__name__)
 class ResourceService:
     """Service for managing learning resources"""
     
+    # Writers load, modify and rewrite the whole CSV; the CSV import does that
+    # on a worker thread, so every writer serializes on this lock
+    _write_lock = asyncio.Lock()
+    
     def _load_resources(self) -> pd.DataFrame:
         """Load resources from CSV"""
         if not os.path.exists(settings.RESOURCES_FILE):
@@ -27,7 +33,16 @@ class ResourceService:
     def _save_resources(self, df: pd.DataFrame):
         """Save resources to CSV"""
         os.makedirs(settings.DATA_DIR, exist_ok=True)
-        df.to_csv(settings.RESOURCES_FILE, index=False)
+        # Readers don't take the lock, so never truncate the live file: write
+        # a temp file next to it and swap it in atomically
+        fd, tmp_path = tempfile.mkstemp(dir=settings.DATA_DIR, suffix=".csv")
+        try:
+            with os.fdopen(fd, "w", newline="") as f:
+                df.to_csv(f, index=False)
+            os.replace(tmp_path, settings.RESOURCES_FILE)
+        except Exception:
+            os.remove(tmp_path)
+            raise
     
     async def get_resources(
         self,
@@ -77,20 +92,21 @@ class ResourceService:
     
     async def create_resource(self, resource: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new resource"""
-        try:
-            df = self._load_resources()
+        async with self._write_lock:
+            try:
+                df = self._load_resources()
             
-            # Add new resource
-            new_row = pd.DataFrame([resource])
-            df = pd.concat([df, new_row], ignore_index=True)
+                # Add new resource
+                new_row = pd.DataFrame([resource])
+                df = pd.concat([df, new_row], ignore_index=True)
             
-            self._save_resources(df)
+                self._save_resources(df)
             
-            return resource
+                return resource
             
-        except Exception as e:
-            logger.error(f"Error creating resource: {str(e)}", exc_info=True)
-            raise
+            except Exception as e:
+                logger.error(f"Error creating resource: {str(e)}", exc_info=True)
+                raise
     
     async def update_resource(
         self,
@@ -98,76 +114,86 @@ class ResourceService:
         resource: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
         """Update an existing resource"""
-        try:
-            df = self._load_resources()
+        async with self._write_lock:
+            try:
+                df = self._load_resources()
             
-            # Find and update
-            idx = df[df["resource_id"] == resource_id].index
+                # Find and update
+                idx = df[df["resource_id"] == resource_id].index
             
-            if len(idx) == 0:
-                return None
+                if len(idx) == 0:
+                    return None
             
-            for key, value in resource.items():
-                df.loc[idx[0], key] = value
+                for key, value in resource.items():
+                    df.loc[idx[0], key] = value
             
-            self._save_resources(df)
+                self._save_resources(df)
             
-            return df.loc[idx[0]].to_dict()
+                return df.loc[idx[0]].to_dict()
             
-        except Exception as e:
-            logger.error(f"Error updating resource: {str(e)}", exc_info=True)
-            raise
+            except Exception as e:
+                logger.error(f"Error updating resource: {str(e)}", exc_info=True)
+                raise
     
     async def delete_resource(self, resource_id: str) -> bool:
         """Delete a resource"""
-        try:
-            df = self._load_resources()
+        async with self._write_lock:
+            try:
+                df = self._load_resources()
             
-            # Remove resource
-            initial_len = len(df)
-            df = df[df["resource_id"] != resource_id]
+                # Remove resource
+                initial_len = len(df)
+                df = df[df["resource_id"] != resource_id]
             
-            if len(df) == initial_len:
-                return False
+                if len(df) == initial_len:
+                    return False
             
-            self._save_resources(df)
-            return True
+                self._save_resources(df)
+                return True
             
-        except Exception as e:
-            logger.error(f"Error deleting resource: {str(e)}", exc_info=True)
-            return False
+            except Exception as e:
+                logger.error(f"Error deleting resource: {str(e)}", exc_info=True)
+                return False
+    
+    def _merge_resources_csv(self, contents: bytes) -> Dict[str, int]:
+        """Merge uploaded CSV rows into the resources file (blocking)"""
+        from io import StringIO
+        new_df = pd.read_csv(StringIO(contents.decode('utf-8')))
+        
+        # Load existing
+        existing_df = self._load_resources()
+        
+        # Merge (update existing, add new)
+        created = 0
+        updated = 0
+        
+        for _, row in new_df.iterrows():
+            rid = row["resource_id"]
+            if rid in existing_df["resource_id"].values:
+                # Update
+                idx = existing_df[existing_df["resource_id"] == rid].index[0]
+                for col in new_df.columns:
+                    existing_df.loc[idx, col] = row[col]
+                updated += 1
+            else:
+                # Create
+                existing_df = pd.concat([existing_df, row.to_frame().T], ignore_index=True)
+                created += 1
+        
+        self._save_resources(existing_df)
+        
+        return {"created": created, "updated": updated}
     
     async def upload_resources_csv(self, file: UploadFile) -> Dict[str, Any]:
         """Upload resources via CSV"""
         try:
             # Read uploaded CSV
             contents = await file.read()
-            from io import StringIO
-            new_df = pd.read_csv(StringIO(contents.decode('utf-8')))
-            
-            # Load existing
-            existing_df = self._load_resources()
-            
-            # Merge (update existing, add new)
-            created = 0
-            updated = 0
-            
-            for _, row in new_df.iterrows():
-                rid = row["resource_id"]
-                if rid in existing_df["resource_id"].values:
-                    # Update
-                    idx = existing_df[existing_df["resource_id"] == rid].index[0]
-                    for col in new_df.columns:
-                        existing_df.loc[idx, col] = row[col]
-                    updated += 1
-                else:
-                    # Create
-                    existing_df = pd.concat([existing_df, row.to_frame().T], ignore_index=True)
-                    created += 1
-            
-            self._save_resources(existing_df)
-            
-            return {"created": created, "updated": updated}
+            
+            # Parsing and the row-by-row merge are CPU-bound; keep them off
+            # the event loop
+            async with self._write_lock:
+                return await asyncio.to_thread(self._merge_resources_csv, contents)
             
         except Exception as e:
             logger.error(f"Error uploading CSV: {str(e)}", exc_info=True)
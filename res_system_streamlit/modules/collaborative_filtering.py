@@ -466,6 +466,30 @@ class CollaborativeFilteringRecommender:
         return recommendations
 
 
+# Shared recommender, so the pickled models are loaded once rather than on
+# every recommendation request. Rebuilt when a retrain rewrites the files
+_cf_recommender = None
+_cf_model_mtimes = None
+
+
+def _model_mtimes():
+    """Modification times of the cached model files (None if missing)"""
+    return tuple(
+        os.path.getmtime(path) if os.path.exists(path) else None
+        for path in (KMEANS_MODEL_PATH, XGBOOST_MODEL_PATH, SCALER_PATH)
+    )
+
+
+def get_cf_recommender():
+    """Get the shared CF recommender, reloading it after the models are retrained"""
+    global _cf_recommender, _cf_model_mtimes
+    mtimes = _model_mtimes()
+    if _cf_recommender is None or mtimes != _cf_model_mtimes:
+        _cf_recommender = CollaborativeFilteringRecommender()
+        _cf_model_mtimes = mtimes
+    return _cf_recommender
+
+
 def hybrid_recommend(student_id, weak_questions, internal_no, co_map, topic_map, 
                      resources_df, top_k_per_co=7, cf_weight=0.7):
     """
@@ -476,7 +500,7 @@ def hybrid_recommend(student_id, weak_questions, internal_no, co_map, topic_map,
     Args:
         cf_weight: Weight for CF score (1-cf_weight will be content-based weight)
     """
-    cf_recommender = CollaborativeFilteringRecommender()
+    cf_recommender = get_cf_recommender()
     
     # Get CF recommendations
     cf_recs = cf_recommender.recommend_resources_cf(
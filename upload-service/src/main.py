@@ -6,8 +6,10 @@ Handles CSV/XLSX upload, parsing, validation, and storage
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import tempfile
 import os
+import hashlib
 from pathlib import Path
 import logging
 from typing import Optional
@@ -39,14 +41,48 @@ app = FastAPI(
 )
 
 # Add CORS middleware
+# Browser origins allowed to call this API (comma-separated CORS_ORIGINS).
+# An explicit list keeps credentialed CORS valid and max_age lets browsers
+# cache preflights instead of sending an OPTIONS before every upload
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:5173,http://frontend:5173").split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=600,
 )
 
+UPLOAD_CHUNK_SIZE = 1 << 20  # Copy uploads to disk 1 MiB at a time
+
+
+async def save_upload_to_temp(file: UploadFile):
+    """
+    Stream an upload to a temp file in chunks, hashing as it goes, so the
+    whole file is never held in memory.
+    Returns (temp_file_path, sha256_hex, size_in_bytes)
+    """
+    suffix = Path(file.filename).suffix.lower()
+    hasher = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+                tmp.write(chunk)
+                size += len(chunk)
+        except Exception:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    return tmp.name, hasher.hexdigest(), size
+
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -83,7 +119,6 @@ async def upload_legacy(
     """
     import pandas as pd
     import re
-    import hashlib
     import numpy as np
 
     temp_file_path = None
@@ -91,15 +126,8 @@ async def upload_legacy(
     try:
         logger.info(f"📤 Starting upload: {file.filename} for course {courseId}, assessment {assessmentName}")
 
-        # Save uploaded file temporarily
-        suffix = Path(file.filename).suffix.lower()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            temp_file_path = tmp.name
-
-        # Calculate file hash for idempotency
-        file_hash = hashlib.sha256(content).hexdigest()
+        # Save uploaded file temporarily, hashing it for idempotency
+        temp_file_path, file_hash, _ = await save_upload_to_temp(file)
 
         # Check if already processed
         existing = db_client.check_file_exists(file_hash)
@@ -115,7 +143,7 @@ async def upload_legacy(
 
         # Read file
         file_type = marksheet_parser.detect_file_type(temp_file_path)
-        df = marksheet_parser.read_file(temp_file_path, file_type)
+        df = await asyncio.to_thread(marksheet_parser.read_file, temp_file_path, file_type)
 
         logger.info(f"📊 Read {len(df)} rows and {len(df.columns)} columns")
         logger.info(f"📋 Columns: {list(df.columns)}")
@@ -130,8 +158,8 @@ async def upload_legacy(
         # Create dynamic table using helper function
         db_client.create_marksheet_table(table_name, list(df.columns))
 
-        # Insert all raw data
-        db_client.insert_marksheet_data(table_name, df.to_dict('records'))
+        # Insert all raw data (blocking DB work runs off the event loop)
+        await asyncio.to_thread(db_client.insert_marksheet_data, table_name, df.to_dict('records'))
 
         logger.info(f"✅ Created and populated table {table_name} with {len(df)} rows")
 
@@ -157,7 +185,7 @@ async def upload_legacy(
         logger.info(f"🎓 Found {len(students_data)} students to enroll")
 
         # Auto-enroll students
-        enrollment_result = db_client.auto_enroll_students(courseId, students_data)
+        enrollment_result = await asyncio.to_thread(db_client.auto_enroll_students, courseId, students_data)
         logger.info(f"✅ Enrollment complete: {enrollment_result}")
 
         # Get or create assessment for quick-upload path
@@ -221,7 +249,7 @@ async def upload_legacy(
 
             # Bulk insert scores
             if score_records:
-                db_client.bulk_insert_student_scores(assessment_id, score_records)
+                await asyncio.to_thread(db_client.bulk_insert_student_scores, assessment_id, score_records)
                 logger.info(f"✅ Inserted {len(score_records)} scores")
 
                 # Insert column metadata
@@ -326,17 +354,13 @@ async def upload_marksheet(
             raise HTTPException(status_code=404, detail=f"Course {course_id} not found")
         
         # Save uploaded file temporarily
-        suffix = Path(file.filename).suffix.lower()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            temp_file_path = tmp.name
-        
-        file_size = len(content)
+        temp_file_path, _, file_size = await save_upload_to_temp(file)
         
         # Parse marksheet
         logger.info(f"Parsing marksheet: {file.filename}")
-        df, q_columns, co_mappings, file_type, file_hash = marksheet_parser.parse_marksheet(temp_file_path)
+        df, q_columns, co_mappings, file_type, file_hash = await asyncio.to_thread(
+            marksheet_parser.parse_marksheet, temp_file_path
+        )
         
         # Check if file already processed (idempotency)
         existing = db_client.check_file_exists(file_hash)
@@ -378,7 +402,7 @@ async def upload_marksheet(
         # Create dynamic table and insert raw data
         logger.info(f"Creating dynamic table: {table_name}")
         db_client.create_marksheet_table(table_name, list(df.columns))
-        db_client.insert_marksheet_data(table_name, df.to_dict('records'))
+        await asyncio.to_thread(db_client.insert_marksheet_data, table_name, df.to_dict('records'))
 
         # Create marksheet record
         marksheet_id = db_client.create_marksheet_record(
@@ -403,7 +427,7 @@ async def upload_marksheet(
 
         # Auto-enroll students
         logger.info(f"Auto-enrolling {len(students_data)} students")
-        enrollment_result = db_client.auto_enroll_students(course_id, students_data)
+        enrollment_result = await asyncio.to_thread(db_client.auto_enroll_students, course_id, students_data)
         logger.info(f"Enrollment result: {enrollment_result}")
 
         # Extract student scores
@@ -440,8 +464,8 @@ async def upload_marksheet(
         
         # Bulk insert student scores
         logger.info(f"Inserting {len(score_records)} score records")
-        db_client.bulk_insert_student_scores(
-            assessment_id, score_records
+        await asyncio.to_thread(
+            db_client.bulk_insert_student_scores, assessment_id, score_records
         )
         
         # Insert raw marks column metadata
@@ -290,53 +290,78 @@ class DatabaseClient:
 
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                for student in students_data:
-                    usn = student['usn']
-                    name = student.get('name', usn)
+                # Set-based lookups/inserts: a fixed handful of round-trips
+                # per marksheet instead of 2-4 queries per student
+                usns = list(dict.fromkeys(student['usn'] for student in students_data))
 
-                    # Check if user exists
-                    cur.execute("SELECT id FROM users WHERE usn = %s", (usn,))
-                    user = cur.fetchone()
+                cur.execute("SELECT id, usn FROM users WHERE usn = ANY(%s)", (usns,))
+                user_ids = {row['usn']: row['id'] for row in cur.fetchall()}
 
-                    if not user:
-                        # Create user with default password (usn)
-                        default_password = usn.lower()
-                        password_hash = bcrypt.hashpw(
-                            default_password.encode('utf-8'),
-                            bcrypt.gensalt()
-                        ).decode('utf-8')
+                # First row wins for a USN's name, as in the marksheet order
+                names = {}
+                for student in students_data:
+                    names.setdefault(student['usn'], student.get('name', student['usn']))
 
-                        # Email must be lowercase to match login normalization
-                        student_email = f"{usn.lower()}@dsce.edu.in"
+                new_users = []
+                for usn in usns:
+                    if usn in user_ids:
+                        continue
+                    # Create user with default password (usn)
+                    default_password = usn.lower()
+                    password_hash = bcrypt.hashpw(
+                        default_password.encode('utf-8'),
+                        bcrypt.gensalt()
+                    ).decode('utf-8')
 
-                        cur.execute("""
-                            INSERT INTO users (email, password_hash, role, name, usn, department)
-                            VALUES (%s, %s, 'student', %s, %s, 'AI')
-                            RETURNING id
-                        """, (student_email, password_hash, name, usn))
+                    # Email must be lowercase to match login normalization
+                    student_email = f"{usn.lower()}@dsce.edu.in"
+                    new_users.append((student_email, password_hash, names[usn], usn))
 
-                        user_id = cur.fetchone()['id']
-                        created += 1
-                        logger.info(f"Created student account: {usn}")
-                    else:
-                        user_id = user['id']
+                if new_users:
+                    rows = execute_values(
+                        cur,
+                        """
+                        INSERT INTO users (email, password_hash, role, name, usn, department)
+                        VALUES %s
+                        RETURNING id, usn
+                        """,
+                        new_users,
+                        template="(%s, %s, 'student', %s, %s, 'AI')",
+                        fetch=True
+                    )
+                    user_ids.update((row['usn'], row['id']) for row in rows)
+                    created = len(new_users)
+                    logger.info(f"Created {created} student accounts")
 
-                    # Check if already enrolled
-                    cur.execute("""
-                        SELECT id FROM students_courses
-                        WHERE student_id = %s AND course_id = %s
-                    """, (user_id, course_id))
+                # Check who is already enrolled
+                cur.execute("""
+                    SELECT student_id FROM students_courses
+                    WHERE course_id = %s AND student_id = ANY(%s::uuid[])
+                """, (course_id, list(user_ids.values())))
+                enrolled_ids = {row['student_id'] for row in cur.fetchall()}
 
-                    if not cur.fetchone():
-                        # Enroll student
-                        cur.execute("""
-                            INSERT INTO students_courses (student_id, course_id, status)
-                            VALUES (%s, %s, 'active')
-                        """, (user_id, course_id))
-                        enrolled += 1
-                        logger.info(f"Enrolled student: {usn} in course")
-                    else:
+                new_enrollments = []
+                for student in students_data:
+                    user_id = user_ids[student['usn']]
+                    if user_id in enrolled_ids:
                         already_enrolled += 1
+                    else:
+                        enrolled_ids.add(user_id)
+                        new_enrollments.append((user_id, course_id))
+
+                if new_enrollments:
+                    # Enroll students
+                    execute_values(
+                        cur,
+                        """
+                        INSERT INTO students_courses (student_id, course_id, status)
+                        VALUES %s
+                        """,
+                        new_enrollments,
+                        template="(%s, %s, 'active')"
+                    )
+                    enrolled = len(new_enrollments)
+                    logger.info(f"Enrolled {enrolled} students in course")
 
         return {
             'created': created,